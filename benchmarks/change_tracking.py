@@ -0,0 +1,62 @@
+"""
+Cost of capturing the changes of a bulk update for events: what update used to do
+(a deep copy before and after every document) against references and compact diffs.
+
+Run from the repository root:
+    python -m benchmarks.change_tracking
+"""
+import copy
+import time
+import tracemalloc
+from classes.update import apply_update
+from classes.eventmanager import change_diff
+
+DOCS = 20_000
+
+def make_changes() -> tuple[list[dict], list[dict]]:
+    before = [
+        {
+            "@id": str(i),
+            "status": "open",
+            "count": i,
+            "customer": {"name": f"customer {i}", "tags": ["a", "b", "c"], "address": {"city": "x", "zip": "12345"}},
+            "lines": [{"sku": j, "qty": 1} for j in range(5)]
+        }
+        for i in range(DOCS)
+    ]
+    after = [apply_update(doc, {"$set": {"status": "paid"}, "$inc": {"count": 1}}) for doc in before]
+    return before, after
+
+def deep_copies(before: list[dict], after: list[dict]):
+    return [(copy.deepcopy(old), copy.deepcopy(new)) for old, new in zip(before, after)]
+
+def references(before: list[dict], after: list[dict]):
+    return list(zip(before, after))
+
+def diffs(before: list[dict], after: list[dict]):
+    return [change_diff(old, new) for old, new in zip(before, after)]
+
+def nothing(before: list[dict], after: list[dict]):
+    return None
+
+def measure(name: str, capture, before: list[dict], after: list[dict]):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = capture(before, after)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"  {name:<28} {size / 1024 / 1024:8.2f} MiB {elapsed * 1000:8.1f} ms")
+
+def main():
+    before, after = make_changes()
+    print(f"capturing {DOCS} updated documents:")
+    measure("deep copies (old)", deep_copies, before, after)
+    measure("full-image subscribers", references, before, after)
+    measure("diff subscribers", diffs, before, after)
+    measure("no subscribers", nothing, before, after)
+
+if __name__ == "__main__":
+    main()
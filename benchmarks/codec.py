@@ -0,0 +1,68 @@
+"""
+Encoding and decoding cost of the stdlib json round-trips the server used to do
+against the codec module and MessagePack (if installed), on payloads shaped like real traffic.
+
+Run from the repository root:
+    python -m benchmarks.codec
+"""
+import json
+import time
+import random
+from classes import codec
+
+ROUNDS = 200
+
+def make_doc(rng: random.Random, i: int) -> dict:
+    return {
+        "@id": f"{i:08x}-0000-4000-8000-000000000000",
+        "name": f"customer {i}",
+        "email": f"customer{i}@example.com",
+        "age": rng.randint(18, 90),
+        "balance": round(rng.uniform(0, 10_000), 2),
+        "active": rng.random() < 0.5,
+        "tags": rng.sample(["a", "b", "c", "d", "e", "f"], 3),
+        "address": {"city": rng.choice(["Berlin", "Paris", "Rome"]), "zip": f"{rng.randint(10000, 99999)}"}
+    }
+
+def payloads() -> dict[str, object]:
+    rng = random.Random(42)
+    docs = [make_doc(rng, i) for i in range(1000)]
+    return {
+        "ok reply": {"op": "ok", "id": "7f0e5c3a-5a43-4f4b-9d1e-0d6a5e8f5c21"},
+        "find_one reply": {"op": "ok", "id": "7f0e5c3a-5a43-4f4b-9d1e-0d6a5e8f5c21", "d": {"result": docs[0]}},
+        "find_all reply (1000)": {"op": "ok", "id": "7f0e5c3a-5a43-4f4b-9d1e-0d6a5e8f5c21", "d": {"result": docs}},
+        "insert_many request (100)": {"op": "insert_many", "id": "7f0e5c3a", "d": {"collection": "c", "docs": docs[:100]}}
+    }
+
+def stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj).encode()
+
+def stdlib_loads(data: bytes):
+    return json.loads(data.decode())
+
+def measure(dumps, loads, payload) -> tuple[float, float]:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        encoded = dumps(payload)
+    encode = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        loads(encoded)
+    decode = (time.perf_counter() - start) / ROUNDS
+
+    return encode, decode
+
+def main():
+    print(f"codec in use: {codec.name}")
+    for name, payload in payloads().items():
+        print(f"{name}:")
+        candidates = [("json + encode (old)", stdlib_dumps, stdlib_loads), (codec.name, codec.dumps, codec.loads)]
+        if codec.MSGPACK is not None:
+            candidates.append((codec.MSGPACK.name, codec.MSGPACK.dumps, codec.MSGPACK.loads))
+        for label, dumps, loads in candidates:
+            encode, decode = measure(dumps, loads, payload)
+            print(f"  {label:<20} {len(dumps(payload)):8} bytes  encode {encode * 1e6:9.1f} us  decode {decode * 1e6:9.1f} us")
+
+if __name__ == "__main__":
+    main()
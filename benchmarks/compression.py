@@ -0,0 +1,71 @@
+"""
+CPU time against bytes saved per frame for the old one-shot zstd call, reused
+contexts at a few levels and a dictionary trained on similar documents.
+
+Needs the zstandard package. Run from the repository root:
+    python -m benchmarks.compression
+"""
+import time
+import random
+import zstd
+from classes import codec
+from classes.compression import Compressor, load_dictionary, train_dictionary
+
+ROUNDS = 200
+
+def make_doc(rng: random.Random, i: int) -> dict:
+    return {
+        "@id": f"{rng.getrandbits(128):032x}",
+        "name": f"customer {i}",
+        "email": f"customer{i}@example.com",
+        "age": rng.randint(18, 90),
+        "balance": round(rng.uniform(0, 10_000), 2),
+        "active": rng.random() < 0.5,
+        "tags": rng.sample(["new", "vip", "churned", "trial", "partner"], 2),
+        "address": {"city": rng.choice(["Berlin", "Paris", "Rome"]), "zip": f"{rng.randint(10000, 99999)}"}
+    }
+
+def frames(rng: random.Random) -> dict[str, bytes]:
+    docs = [make_doc(rng, i) for i in range(1000)]
+    reply = lambda d: codec.dumps({"op": "ok", "id": f"{rng.getrandbits(128):032x}", "d": d})
+    return {
+        "ok reply": reply(None),
+        "find_one reply": reply({"result": docs[0]}),
+        "find_all reply (10)": reply({"result": docs[:10]}),
+        "find_all reply (1000)": reply({"result": docs})
+    }
+
+class OneShot:
+    # What every frame went through before
+    def compress(self, data: bytes) -> bytes:
+        return zstd.compress(data, 1)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstd.uncompress(data)
+
+def measure(compressor, frame: bytes) -> tuple[int, float]:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        compressed = compressor.compress(frame)
+        compressor.decompress(compressed)
+    return len(compressed), (time.perf_counter() - start) / ROUNDS
+
+def main():
+    # Trained on other documents than the ones that get compressed
+    training = random.Random(1)
+    dictionary = load_dictionary(train_dictionary([codec.dumps(make_doc(training, i)) for i in range(5000)]))
+
+    candidates = {
+        "zstd.compress (old)": OneShot(),
+        "context, level 1": Compressor(1),
+        "context, level 3": Compressor(3),
+        "context + dictionary": Compressor(1, dictionary=dictionary, flags=True)
+    }
+    for name, frame in frames(random.Random(42)).items():
+        print(f"{name} ({len(frame)} bytes uncompressed):")
+        for label, compressor in candidates.items():
+            size, elapsed = measure(compressor, frame)
+            print(f"  {label:<22} {size:8} bytes  {(len(frame) - size) / len(frame) * 100:6.1f}% saved  {elapsed * 1e6:8.1f} us round-trip")
+
+if __name__ == "__main__":
+    main()
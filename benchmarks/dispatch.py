@@ -0,0 +1,97 @@
+"""
+Per-request dispatch overhead of the old linear command scan against the registry.
+Finding the command and checking its requirements is measured on its own and together
+with running list_db, which does next to no work itself.
+
+Run from the repository root:
+    python -m benchmarks.dispatch
+"""
+import time
+import asyncio
+from classes import Session
+from commands import Command, CommandRegistry, ListDb, COMMANDS as commands
+
+REQUESTS = 200_000
+
+class NullTransport:
+    def get_write_buffer_size(self) -> int:
+        return 0
+
+class NullWriter:
+    transport = NullTransport()
+
+    def writelines(self, data):
+        pass
+
+    async def drain(self):
+        pass
+
+class NullUser:
+    def has_permission(self, permission: str, db: str = None) -> bool:
+        return True
+
+class NullManager:
+    def get_dbs(self):
+        return ["db"]
+
+async def check_requirements(cls: type[Command], session: Session, request: dict) -> bool:
+    # What every request went through before the registry
+    if cls.requires_login and not session.authed:
+        await session.error("unauthed", request.get("id"))
+        return False
+    if cls.requires_db and not session.db:
+        await session.error("non_open", request.get("id"))
+        return False
+    if cls.requires_coll and not (session.db and request.get("d", {}).get("collection")):
+        await session.error("format", request.get("id"))
+        return False
+    if cls.permission and not session.user.has_permission(cls.permission, session.db.db_name if session.db else None):
+        await session.error("permissions", request.get("id"))
+        return False
+    return True
+
+def linear(run: bool):
+    async def dispatch(request: dict, session: Session, manager: NullManager):
+        for command in commands:
+            if command.name == request["op"]:
+                if await check_requirements(command, session, request) and run:
+                    await command.run(None, request, session, manager)
+                break
+    return dispatch
+
+def registry_dispatch(registry: CommandRegistry, run: bool):
+    async def dispatch(request: dict, session: Session, manager: NullManager):
+        handler = registry.get(request["op"])
+        if run:
+            await handler(None, request, session, manager)
+        else:
+            handler.check(session, request)
+    return dispatch
+
+async def measure(name: str, dispatch, request: dict, session: Session, manager: NullManager):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await dispatch(request, session, manager)
+    elapsed = time.perf_counter() - start
+
+    print(f"  {name:<20} {elapsed / REQUESTS * 1e6:8.2f} us/request")
+
+async def main():
+    session = Session(None, NullWriter())
+    session.authed = True
+    session.user = NullUser()
+    manager = NullManager()
+    request = {"op": ListDb.name, "id": "1"}
+
+    registry = CommandRegistry(commands)
+
+    print(f"dispatching {REQUESTS} {ListDb.name} requests ({len(commands)} commands, {ListDb.name} at position {commands.index(ListDb) + 1}):")
+    print(" lookup and requirement checks:")
+    await measure("linear scan (old)", linear(False), request, session, manager)
+    await measure("registry", registry_dispatch(registry, False), request, session, manager)
+    print(" whole request:")
+    await measure("linear scan (old)", linear(True), request, session, manager)
+    await measure("registry", registry_dispatch(registry, True), request, session, manager)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Per-document matching cost of the old interpreted matcher against compiled query plans.
+
+Run from the repository root:
+    python -m benchmarks.query_matching
+"""
+import time
+import random
+from classes.query import compile_query
+
+DOCS = 200_000
+ROUNDS = 5
+
+def interpreted(query: dict):
+    # The matcher collections used before queries were compiled
+    return lambda doc: all(doc.get(k) == v for k, v in query.items())
+
+def make_docs(count: int) -> list[dict]:
+    rng = random.Random(42)
+    return [
+        {
+            "@id": str(i),
+            "user": f"user{rng.randrange(1000)}",
+            "status": rng.choice(["open", "paid", "shipped", "cancelled"]),
+            "total": rng.randrange(10_000) / 100,
+            "items": rng.randrange(1, 10)
+        }
+        for i in range(count)
+    ]
+
+def bench(name: str, predicate, docs: list[dict]) -> float:
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for doc in docs:
+            predicate(doc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    per_doc = best / len(docs) * 1e9
+    print(f"  {name:<12} {per_doc:8.1f} ns/doc")
+    return per_doc
+
+def main():
+    docs = make_docs(DOCS)
+    query = {"status": "paid", "items": 3, "user": "user7"}
+
+    print(f"{DOCS} documents, best of {ROUNDS}")
+    print("equality on 3 fields:")
+    before = bench("interpreted", interpreted(query), docs)
+    after = bench("compiled", compile_query(query), docs)
+    print(f"  speedup      {before / after:8.2f}x")
+
+    print("range + $in (compiled only, the old matcher had no operators):")
+    bench("compiled", compile_query({"total": {"$gte": 10, "$lt": 50}, "status": {"$in": ["paid", "shipped"]}}), docs)
+
+    print("compiling a query with a cached shape:")
+    start = time.perf_counter()
+    for i in range(100_000):
+        compile_query({"status": "paid", "items": i})
+    print(f"  {(time.perf_counter() - start) / 100_000 * 1e9:8.1f} ns/query")
+
+if __name__ == "__main__":
+    main()
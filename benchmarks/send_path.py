@@ -0,0 +1,67 @@
+"""
+Small replies per second through the session send path: the old write and drain per
+frame against the per-session output buffer that coalesces the frames of a loop tick.
+
+Run from the repository root:
+    python -m benchmarks.send_path
+"""
+import time
+import socket
+import struct
+import asyncio
+from classes import Session
+
+FRAMES = 100_000
+CONCURRENCY = 50
+
+class DrainEverySession(Session):
+    # The send path before output buffering
+    def flush(self):
+        pass
+
+    async def send_raw(self, *parts: bytes):
+        header = struct.pack(">I", sum(len(part) for part in parts))
+        self.writer.writelines((header, *parts))
+        await self.writer.drain()
+
+async def consume(reader: asyncio.StreamReader, total: int):
+    received = 0
+    while received < total:
+        chunk = await reader.read(1 << 16)
+        if not chunk:
+            break
+        received += len(chunk)
+
+async def measure(name: str, session_type: type[Session]):
+    server_sock, client_sock = socket.socketpair()
+    _, writer = await asyncio.open_connection(sock=server_sock)
+    reader, client_writer = await asyncio.open_connection(sock=client_sock)
+    session = session_type(None, writer)
+
+    async def replier(count: int):
+        # Like pipelined requests, each sender replies once per loop tick
+        for i in range(count):
+            await session.operation("ok", data_id=str(i))
+            await asyncio.sleep(0)
+
+    per_sender = FRAMES // CONCURRENCY
+    total = CONCURRENCY * sum(4 + len(session.codec.dumps({"op": "ok", "id": str(i)})) for i in range(per_sender))
+    consumer = asyncio.create_task(consume(reader, total))
+    start = time.perf_counter()
+    await asyncio.gather(*(replier(per_sender) for _ in range(CONCURRENCY)))
+    session.flush()
+    # Done once the other end got every byte
+    await consumer
+    elapsed = time.perf_counter() - start
+
+    print(f"  {name:<24} {FRAMES / elapsed:12,.0f} frames/s")
+    writer.close()
+    client_writer.close()
+
+async def main():
+    print(f"{FRAMES} small replies from {CONCURRENCY} concurrent senders:")
+    await measure("drain every frame (old)", DrainEverySession)
+    await measure("output buffer", Session)
+
+if __name__ == "__main__":
+    asyncio.run(main())
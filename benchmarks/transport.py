@@ -0,0 +1,75 @@
+"""
+Request latency over TCP on localhost against the unix socket, both served by an
+in-process server with a throwaway data directory, and of the embedded mode.
+
+Run from the repository root:
+    python -m benchmarks.transport
+"""
+import os
+import time
+import asyncio
+import tempfile
+import statistics
+import main as server
+from classes import Manager
+from utils import setup_data
+from lib import Connection, EmbeddedConnection
+
+REQUESTS = 5_000
+PASSWORD = "benchmark"
+
+async def measure(name: str, conn: Connection):
+    for _ in range(100):
+        await conn.list_databases()
+
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        await conn.list_databases()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"  {name:<12} p50 {p50 * 1e6:7.1f} us  p99 {p99 * 1e6:7.1f} us  {REQUESTS / sum(latencies):9,.0f} req/s")
+
+async def main():
+    with tempfile.TemporaryDirectory() as save_dir:
+        os.environ["ROOT_PASSWORD"] = PASSWORD
+        if error := setup_data(save_dir):
+            print(error)
+            return
+
+        server.manager = Manager(save_dir)
+        server.manager.init()
+        tcp = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+        socket_path = f"{save_dir}/jsondb.sock"
+        unix = await asyncio.start_unix_server(server.handle_client, socket_path)
+
+        tcp_conn = Connection("127.0.0.1", tcp.sockets[0].getsockname()[1])
+        unix_conn = Connection(unix_path=socket_path)
+        # Uncompressed, only the transport should differ
+        await tcp_conn.connect("root", PASSWORD, zstd=False)
+        await unix_conn.connect("root", PASSWORD, zstd=False)
+
+        # Embedded mode runs its own database, it cant share the directory with the server
+        embedded_conn = EmbeddedConnection(f"{save_dir}/embedded")
+        os.mkdir(embedded_conn.save_dir)
+        await embedded_conn.connect("root", PASSWORD)
+
+        print(f"{REQUESTS} sequential list_db requests:")
+        await measure("tcp", tcp_conn)
+        await measure("unix socket", unix_conn)
+        await measure("embedded", embedded_conn)
+
+        embedded_conn.close()
+        await embedded_conn.wait_closed()
+
+        tcp_conn.close()
+        unix_conn.close()
+        tcp.close()
+        unix.close()
+        server.manager.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,9 @@
 from .manager import Manager
 from .db import Database
-from .collection import Collection
-from .session import Session
+from .collection import Collection, WriteConcern
+from .session import Session, LocalSession
+from .cursor import Cursor
 from .eventmanager import EventManager
-from .security import Permissions, User, UserManagement
\ No newline at end of file
+from .security import Permissions, User, UserManagement
+from .pipeline import Mode, Pipeline
+from . import codec
\ No newline at end of file
@@ -0,0 +1,161 @@
+import heapq
+import itertools
+import typing
+from .index import index_key, sort_key, make_sort_key
+from .query import compile_query, get_path, project, validate, validate_projection
+if typing.TYPE_CHECKING:
+    from .collection import Collection
+
+ACCUMULATORS = ("$count", "$sum", "$avg", "$min", "$max")
+
+def _value(doc: dict, expression):
+    """
+    "$field" refers to a (dotted) field of the document, anything else is a constant.
+    """
+    if isinstance(expression, str) and expression.startswith("$"):
+        return get_path(doc, expression[1:])
+    if isinstance(expression, dict):
+        return {key: _value(doc, sub) for key, sub in expression.items()}
+    return expression
+
+def _stage(stage) -> tuple[str, typing.Any]:
+    if not isinstance(stage, dict) or len(stage) != 1:
+        raise ValueError("Every stage needs exactly one operator")
+    return next(iter(stage.items()))
+
+def _check(pipeline):
+    if not isinstance(pipeline, list):
+        raise ValueError("The pipeline has to be a list of stages")
+
+    for stage in pipeline:
+        name, arg = _stage(stage)
+        match name:
+            case "$match":
+                if not validate(arg):
+                    raise ValueError("Invalid $match query")
+            case "$sort":
+                if not isinstance(arg, dict) or not arg or not all(direction in (1, -1) for direction in arg.values()):
+                    raise ValueError("$sort expects {field: 1 | -1}")
+            case "$limit" | "$skip":
+                if type(arg) != int or arg < 0:
+                    raise ValueError(f"{name} expects a positive number")
+            case "$project":
+                if not validate_projection(arg):
+                    raise ValueError("Invalid $project")
+            case "$count":
+                if not isinstance(arg, str) or not arg:
+                    raise ValueError("$count expects a field name")
+            case "$group":
+                if not isinstance(arg, dict) or "@id" not in arg:
+                    raise ValueError("$group needs an @id")
+                for field, accumulator in arg.items():
+                    if field == "@id":
+                        continue
+                    op, _ = _stage(accumulator)
+                    if op not in ACCUMULATORS:
+                        raise ValueError(f"Unknown accumulator {op}")
+            case _:
+                raise ValueError(f"Unknown stage {name}")
+
+def _group(docs, spec: dict) -> list[dict]:
+    accumulators = [(field, *_stage(accumulator)) for field, accumulator in spec.items() if field != "@id"]
+    # key -> (output document, values counted per $avg field), the counts stay out of the user's fields
+    groups: dict[typing.Hashable, tuple[dict, dict]] = {}
+
+    for doc in docs:
+        group_id = _value(doc, spec["@id"])
+        key = index_key(group_id)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = ({"@id": group_id}, {})
+        state, counts = group
+
+        for field, op, expression in accumulators:
+            if op == "$count":
+                state[field] = state.get(field, 0) + 1
+                continue
+
+            value = _value(doc, expression)
+            match op:
+                case "$sum" | "$avg":
+                    # Like MongoDB, values that arent numbers are ignored
+                    if value.__class__ in (int, float):
+                        state[field] = state.get(field, 0) + value
+                        counts[field] = counts.get(field, 0) + 1
+                case "$min" | "$max":
+                    if value is None:
+                        continue
+                    current = state.get(field)
+                    if current is None:
+                        state[field] = value
+                    elif op == "$min" and sort_key(value) < sort_key(current):
+                        state[field] = value
+                    elif op == "$max" and sort_key(value) > sort_key(current):
+                        state[field] = value
+
+    result = []
+    for state, counts in groups.values():
+        for field, op, _ in accumulators:
+            if op == "$avg":
+                state[field] = state[field] / counts[field] if counts.get(field) else None
+            elif op == "$sum":
+                state.setdefault(field, 0)
+            else:
+                state.setdefault(field, None)
+        result.append(state)
+    return result
+
+def aggregate(collection: "Collection", pipeline: list[dict]) -> list[dict]:
+    """
+    Runs an aggregation pipeline over a collection. Raises ValueError for invalid pipelines.
+
+    Leading $match, $sort, $skip and $limit stages are handed to the collection,
+    so indexes and top-k sorting are used for them.
+    """
+    _check(pipeline)
+
+    stages = list(pipeline)
+    query = None
+    sort = None
+    skip = 0
+    limit = None
+    if stages and "$match" in stages[0]:
+        query = stages.pop(0)["$match"]
+    if stages and "$sort" in stages[0]:
+        sort = stages.pop(0)["$sort"]
+    while stages and ("$skip" in stages[0] or "$limit" in stages[0]):
+        name, arg = _stage(stages.pop(0))
+        if name == "$skip":
+            skip += arg
+            if limit is not None:
+                limit = max(0, limit - arg)
+        else:
+            limit = arg if limit is None else min(limit, arg)
+
+    docs = collection.find_iter(query, sort, limit, skip)
+
+    for i, stage in enumerate(stages):
+        name, arg = _stage(stage)
+        match name:
+            case "$match":
+                predicate = compile_query(arg)
+                docs = filter(predicate, docs)
+            case "$group":
+                docs = _group(docs, arg)
+            case "$sort":
+                following = stages[i + 1] if i + 1 < len(stages) else {}
+                if "$limit" in following:
+                    # Top-k, only as many documents as the next stage keeps
+                    docs = heapq.nsmallest(following["$limit"], docs, key=make_sort_key(arg))
+                else:
+                    docs = sorted(docs, key=make_sort_key(arg))
+            case "$skip":
+                docs = itertools.islice(docs, arg, None)
+            case "$limit":
+                docs = itertools.islice(docs, arg)
+            case "$project":
+                docs = (project(doc, arg) for doc in docs)
+            case "$count":
+                docs = [{arg: sum(1 for _ in docs)}]
+
+    return list(docs)
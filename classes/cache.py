@@ -0,0 +1,83 @@
+import json
+import typing
+from collections import OrderedDict
+if typing.TYPE_CHECKING:
+    from .collection import Collection
+
+def cache_key(encoding: str, op: str, query: dict, sort: dict = None, limit: int = None, skip: int = 0, projection: dict = None) -> tuple:
+    """
+    Normalized key of a read. Field order inside the query doesnt matter, the order of sort fields does.
+    """
+    return (
+        encoding,
+        op,
+        json.dumps(query or {}, sort_keys=True),
+        json.dumps(list(sort.items())) if sort else None,
+        limit,
+        skip,
+        json.dumps(projection, sort_keys=True) if projection else None
+    )
+
+class QueryCache:
+    """
+    LRU cache of encoded read results, shared by all collections and capped in bytes.
+    Entries remember the version of their collection and are stale as soon as it changes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[tuple, tuple[int, bytes]] = OrderedDict()
+
+    def get(self, collection: "Collection", key: tuple) -> bytes | None:
+        entry = self._entries.get((collection, key))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        version, encoded = entry
+        if version != collection.version:
+            self._drop((collection, key))
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end((collection, key))
+        self.hits += 1
+        return encoded
+
+    def put(self, collection: "Collection", key: tuple, encoded: bytes):
+        # A single huge result would push out everything else
+        if len(encoded) > self.max_bytes // 4:
+            return
+
+        self._drop((collection, key))
+        self._entries[(collection, key)] = (collection.version, encoded)
+        self.size += len(encoded)
+
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def invalidate(self, collection: "Collection"):
+        for entry_key in [k for k in self._entries if k[0] is collection]:
+            self._drop(entry_key)
+
+    def _drop(self, entry_key: tuple):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,127 @@
+import re
+import json
+import math
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Whatever loads raises for a malformed body
+DecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+if msgpack is not None:
+    DecodeError += (ValueError, msgpack.UnpackException)
+
+def _dumps_json(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def _loads_json(data: bytes | str):
+    return json.loads(data)
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        # Integers beyond 64 bit raise a TypeError, over the wire they would come back as floats
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(data: bytes | str):
+        return orjson.loads(data)
+
+    # orjson reads integers beyond 64 bit as floats without complaining, the stdlib keeps them exact
+    _BIG_INT = re.compile(rb"\d{20}|-\d{19}")
+
+    def dumps_exact(obj) -> bytes:
+        """
+        Like dumps, but for snapshots and logs: values orjson cant write exactly go through the stdlib.
+        """
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return _dumps_json(obj)
+        # orjson writes NaN and Infinity as null, the stdlib keeps them
+        if b"null" in data:
+            return _dumps_json(obj)
+        return data
+
+    def loads_exact(data: bytes | str):
+        """
+        Like loads, but for snapshots and logs, which may hold big integers, NaN or Infinity.
+        Only runs when loading, the scan would cost more than the decode on every frame.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        if _BIG_INT.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # NaN and Infinity, which json.dump writes and older snapshots may still contain
+                pass
+        return json.loads(data)
+else:
+    dumps = dumps_exact = _dumps_json
+    loads = loads_exact = _loads_json
+
+name = "orjson" if orjson is not None else "json"
+
+def _storable_json(value) -> bool:
+    return True
+
+class Codec:
+    """
+    A body encoding for frames. `head` and `tail` wrap an already encoded "d"
+    into a reply, so cached bodies can be sent without encoding them again.
+    """
+
+    def __init__(self, name: str, dumps, loads, head, tail: bytes, storable=None):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self.head = head
+        self.tail = tail
+        # Whether a decoded value can be stored as it is, bodies that only carry JSON values always can
+        self.storable = storable or _storable_json
+
+def _json_head(op: str, data_id: str = None) -> bytes:
+    head = b'{"op":' + dumps(op)
+    if data_id != None:
+        head += b',"id":' + dumps(data_id)
+    return head + b',"d":'
+
+JSON = Codec("json", dumps, loads, _json_head, b"}")
+
+if msgpack is not None:
+    def _dumps_msgpack(obj) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def _ext_hook(code: int, data: bytes):
+        raise ValueError(f"Extension type {code} is not supported")
+
+    def _loads_msgpack(data: bytes):
+        return msgpack.unpackb(data, raw=False, strict_map_key=True, ext_hook=_ext_hook)
+
+    def _storable_msgpack(value) -> bool:
+        # Bin values, timestamps and NaN would be changed or lost by JSON replies and by the log
+        if isinstance(value, dict):
+            return all(type(key) == str and _storable_msgpack(item) for key, item in value.items())
+        if isinstance(value, list):
+            return all(_storable_msgpack(item) for item in value)
+        if isinstance(value, float):
+            return math.isfinite(value)
+        return not isinstance(value, (bytes, msgpack.Timestamp))
+
+    def _msgpack_head(op: str, data_id: str = None) -> bytes:
+        # A map is its size followed by the keys and values, so "d" can simply come last
+        items = ["op", op]
+        if data_id != None:
+            items += ["id", data_id]
+        items.append("d")
+        return bytes([0x80 | (len(items) + 1) // 2]) + b"".join(_dumps_msgpack(item) for item in items)
+
+    MSGPACK = Codec("msgpack", _dumps_msgpack, _loads_msgpack, _msgpack_head, b"", _storable_msgpack)
+else:
+    MSGPACK = None
+
+# Encodings this side can speak, by the name negotiated at auth
+CODECS = {codec.name: codec for codec in (JSON, MSGPACK) if codec is not None}
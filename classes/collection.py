@@ -1,75 +1,368 @@
 import os
 import json
+import time
 import uuid
-import copy
+import heapq
 import typing
+import itertools
+from . import codec
+from .index import HashIndex, SortedIndex, INDEX_TYPES, index_from_spec, make_sort_key
+from .query import compile_query, is_operator, project
+from .update import apply_update, upsert_document
 if typing.TYPE_CHECKING:
     from .db import Database
 
+class WriteConcern:
+    NONE = "none"
+    BUFFERED = "buffered"
+    FSYNC = "fsync"
+
+    ALL = (NONE, BUFFERED, FSYNC)
+
 class Collection:
     def __init__(self, name: str, db: "Database"):
         self.name = name
-        self.data: list[dict] = None
+        # Keyed by "@id", dicts keep insertion order so iteration matches the old list
+        self.data: dict[str, dict] = None
         self.db = db
         self.path = f"{self.db.save_dir}/files/{self.db.db_name}/{self.name}.json"
+        self.wal_path = f"{self.db.save_dir}/files/{self.db.db_name}/{self.name}.wal"
+        self.index_path = f"{self.db.save_dir}/files/{self.db.db_name}/{self.name}.idx"
+        self.indexes: dict[str, HashIndex | SortedIndex] = {}
+        self.wal_size = 0
+        self.last_checkpoint = time.monotonic()
+        # Bumped on every change, cached reads of an older version are stale
+        self.version = 0
 
     def load(self):
-        if not os.path.exists(self.path):
-            self.data = []
-        else:
-            with open(self.path, "r") as f:
+        self.data = {}
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
                 content = f.read()
-            self.data = json.loads(content)
+            for doc in codec.loads_exact(content):
+                doc_id = doc.setdefault("@id", str(uuid.uuid4()))
+                self.data[doc_id] = doc
+
+        self._replay()
+        self._load_indexes()
+
+    def _replay(self):
+        """
+        Applies the write-ahead log on top of the loaded snapshot.
+        Every record carries the full affected documents or their ids, so replaying
+        a record that is already part of the snapshot is harmless.
+        """
+        if not os.path.exists(self.wal_path):
+            return
+
+        # End of the last complete record, anything behind it is a torn write
+        good = 0
+        with open(self.wal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if not line.strip():
+                    good += len(line)
+                    continue
+                try:
+                    record = codec.loads_exact(line)
+                except codec.DecodeError:
+                    break
+
+                match record.get("op"):
+                    case "insert" | "update":
+                        for doc in record["docs"]:
+                            self.data[doc["@id"]] = doc
+                    case "delete":
+                        for doc_id in record["ids"]:
+                            self.data.pop(doc_id, None)
+                good += len(line)
+
+        if good < os.path.getsize(self.wal_path):
+            # New records would end up glued to the broken line and get lost with it on the next replay
+            os.truncate(self.wal_path, good)
+        self.wal_size = good
+
+    def _load_indexes(self):
+        self.indexes = {}
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, "r") as f:
+            specs = json.load(f)
+        for spec in specs:
+            index = index_from_spec(spec)
+            index.build(self.data.values())
+            self.indexes[index.name] = index
+
+    def _save_indexes(self):
+        with open(self.index_path, "w") as f:
+            json.dump([index.spec() for index in self.indexes.values()], f)
+
+    def create_index(self, fields: list[str], type: str = HashIndex.type):
+        """
+        Builds an index over the given fields. Returns the index name, or None if it already exists.
+        """
+        index = INDEX_TYPES[type](fields)
+        if index.name in self.indexes:
+            return None
+
+        index.build(self.data.values())
+        self.indexes[index.name] = index
+        self._save_indexes()
+
+        return index.name
 
-    def delete(self):
-        os.remove(self.path)
+    def drop_index(self, name: str):
+        if self.indexes.pop(name, None) is None:
+            return False
 
-    async def save(self):
-        await self.db.manager.save(self)
+        self._save_indexes()
+        return True
 
-    async def insert(self, document: dict):
+    def list_indexes(self):
+        return [index.spec() for index in self.indexes.values()]
+
+    def drop(self):
+        for path in (self.path, self.wal_path, self.index_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def save(self, record: dict, concern: str = WriteConcern.NONE):
+        await self.db.manager.save(self, record, concern)
+
+    def _new_ids(self, count: int) -> list[str]:
+        # One call into the OS for all ids instead of one per document
+        raw = os.urandom(16 * count)
+        return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+    def _add(self, document: dict):
+        self.version += 1
+        self.data[document["@id"]] = document
+        for index in self.indexes.values():
+            index.add(document)
+
+    def _apply(self, doc: dict, updates: dict) -> dict:
+        # Documents are replaced, never changed in place, so a running checkpoint
+        # can serialize its shallow copy of the data without locking
+        self.version += 1
+        new = apply_update(doc, updates)
+        new["@id"] = doc["@id"]
+        for index in self.indexes.values():
+            index.replace(doc, new)
+        self.data[new["@id"]] = new
+        return new
+
+    def _remove(self, doc: dict):
+        self.version += 1
+        del self.data[doc["@id"]]
+        for index in self.indexes.values():
+            index.remove(doc)
+
+    def _by_id(self, query: dict) -> bool:
+        # Conditions like {"$in": [...]} on "@id" need the planner or a scan like any other field
+        return "@id" in query and not is_operator(query["@id"])
+
+    def _needs_scan(self, query: dict) -> bool:
+        return not self._by_id(query) and self._plan(query) is None
+
+    async def insert(self, document: dict, concern: str = WriteConcern.NONE):
         document["@id"] = str(uuid.uuid4())
-        self.data.append(document)
-
-        await self.save()
-
-    async def update(self, query: dict, updates: dict):
-        old = {}
-        new = {}
-        for doc in self.data:
-            if all(doc.get(k) == v for k, v in query.items()):
-                old = copy.deepcopy(doc)
-                doc.update(updates)
-                new = copy.deepcopy(doc)
-                
-        await self.save()
-        return old, new
+        self._add(document)
+
+        await self.save({"op": "insert", "docs": [document]}, concern)
+
+    async def insert_many(self, documents: list[dict], concern: str = WriteConcern.NONE):
+        for document, doc_id in zip(documents, self._new_ids(len(documents))):
+            document["@id"] = doc_id
+            self._add(document)
+
+        if documents:
+            await self.save({"op": "insert", "docs": documents}, concern)
+
+    async def update(self, query: dict, updates: dict, concern: str = WriteConcern.NONE, upsert: bool = False):
+        """
+        Returns the matched documents before and after the update. Both are the stored objects,
+        not copies, which is safe because documents are only ever replaced.
+        """
+        before = []
+        after = []
+        for doc in self._matches(query):
+            before.append(doc)
+            after.append(self._apply(doc, updates))
+
+        if not after and upsert:
+            doc = upsert_document(query, updates)
+            doc["@id"] = str(uuid.uuid4())
+            self._add(doc)
+            after.append(doc)
+
+        if after:
+            await self.save({"op": "update", "docs": after}, concern)
+        return before, after
+
+    async def update_many(self, operations: list[tuple[dict, dict]], concern: str = WriteConcern.NONE):
+        """
+        Applies (query, updates) pairs in order. Returns the changed documents before
+        the first and after the last update that touched them.
+        """
+        before: dict[str, dict] = {}
+        after: dict[str, dict] = {}
+
+        if len(operations) > 1 and all(self._needs_scan(query) for query, _ in operations):
+            # A single pass over the collection, every document runs through all operations in order
+            plans = [(compile_query(query), updates) for query, updates in operations]
+            for doc in list(self.data.values()):
+                for predicate, updates in plans:
+                    if predicate(doc):
+                        before.setdefault(doc["@id"], doc)
+                        doc = self._apply(doc, updates)
+                        after[doc["@id"]] = doc
+        else:
+            for query, updates in operations:
+                for doc in self._matches(query):
+                    before.setdefault(doc["@id"], doc)
+                    after[doc["@id"]] = self._apply(doc, updates)
+
+        if after:
+            await self.save({"op": "update", "docs": list(after.values())}, concern)
+        return list(before.values()), list(after.values())
     
-    async def delete(self, str, query: dict):
-        to_delete = [
-            copy.deepcopy(doc)
-            for doc in self.data
-            if all(doc.get(k) == v for k, v in query.items())
-        ]
-        self.data[:] = [
-            doc for doc in self.data
-            if not all(doc.get(k) == v for k, v in query.items())
-        ]
+    async def delete(self, query: dict, concern: str = WriteConcern.NONE):
+        to_delete = self._matches(query)
+        for doc in to_delete:
+            self._remove(doc)
         
-        await self.save()
+        if to_delete:
+            await self.save({"op": "delete", "ids": [doc["@id"] for doc in to_delete]}, concern)
 
         return to_delete
+
+    async def delete_many(self, queries: list[dict], concern: str = WriteConcern.NONE):
+        deleted = []
+        if len(queries) > 1 and all(self._needs_scan(query) for query in queries):
+            # A single pass over the collection instead of one per query
+            predicates = [compile_query(query) for query in queries]
+            for doc in list(self.data.values()):
+                if any(predicate(doc) for predicate in predicates):
+                    self._remove(doc)
+                    deleted.append(doc)
+        else:
+            for query in queries:
+                for doc in self._matches(query):
+                    self._remove(doc)
+                    deleted.append(doc)
+
+        if deleted:
+            await self.save({"op": "delete", "ids": [doc["@id"] for doc in deleted]}, concern)
+        return deleted
+
+    def _plan(self, query: dict):
+        """
+        Picks the index that yields the fewest candidates for the query, or None if no index applies.
+        """
+        best = None
+        best_count = None
+        for index in self.indexes.values():
+            count = index.estimate(query)
+            if count is not None and (best_count is None or count < best_count):
+                best = index
+                best_count = count
+
+        return best
+
+    def _candidates(self, query: dict):
+        """
+        Returns the documents that can possibly match the query without looking at them.
+        """
+        if self._by_id(query):
+            doc = self.data.get(query["@id"]) if isinstance(query["@id"], str) else None
+            return [doc] if doc is not None else []
+
+        index = self._plan(query)
+        if index is not None:
+            return [self.data[doc_id] for doc_id in index.lookup(query)]
+
+        return self.data.values()
+
+    def _matches(self, query: dict) -> list[dict]:
+        # Materialized, callers change self.data while going through the result
+        predicate = compile_query(query)
+        return [doc for doc in self._candidates(query) if predicate(doc)]
+
+    def _sort_index(self, query: dict, sort: dict):
+        """
+        Returns a sorted index that already yields the documents in the requested order,
+        unless another index narrows the query down more and sorting its candidates is cheaper.
+        """
+        if len(sort) != 1 or self._by_id(query):
+            return None
+
+        field = next(iter(sort))
+        index = self._plan(query)
+        if index is not None and not (index.type == SortedIndex.type and index.field == field):
+            return None
+
+        return next((i for i in self.indexes.values() if i.type == SortedIndex.type and i.field == field), None)
             
-    def find_all(self, query: dict = None):
-        if query is None:
-            return self.data
-        
-        return [doc for doc in self.data if all(doc.get(k) == v for k, v in query.items())]
+    def _find(self, query: dict, sort: dict, limit: int, skip: int, projection: dict, snapshot: bool):
+        query = query or {}
+        predicate = compile_query(query)
+        index = self._sort_index(query, sort) if sort else None
+
+        if sort and index is None:
+            docs = (doc for doc in self._candidates(query) if predicate(doc))
+            key = make_sort_key(sort)
+            if limit is not None:
+                # Top-k on a heap, the full set of matches never gets sorted
+                docs = heapq.nsmallest(skip + limit, docs, key=key)
+            else:
+                docs = sorted(docs, key=key)
+            docs = itertools.islice(docs, skip, None)
+        else:
+            if index is not None:
+                candidates = (self.data[doc_id] for doc_id in index.ordered(next(iter(sort.values())) < 0, query))
+            else:
+                candidates = self._candidates(query)
+            if snapshot:
+                # Only references, the documents themselves are never changed in place
+                candidates = list(candidates)
+            # Stops scanning as soon as the page is full
+            matches = (doc for doc in candidates if predicate(doc))
+            docs = itertools.islice(matches, skip, None if limit is None else skip + limit)
+
+        if projection:
+            docs = (project(doc, projection) for doc in docs)
+        return docs
+            
+    def find_all(self, query: dict = None, sort: dict = None, limit: int = None, skip: int = 0, projection: dict = None):
+        return list(self._find(query, sort, limit, skip, projection, False))
+
+    def find_iter(self, query: dict = None, sort: dict = None, limit: int = None, skip: int = 0, projection: dict = None):
+        """
+        Like find_all, but yields the documents lazily. The candidates are captured up front,
+        so the iterator stays valid while the collection changes.
+        """
+        return self._find(query, sort, limit, skip, projection, True)
     
+    def count(self, query: dict = None) -> int:
+        if not query:
+            return len(self.data)
+
+        index = self._plan(query)
+        if index is not None and set(query) == set(index.fields):
+            # The index answers the whole query, no need to look at the documents
+            return index.estimate(query)
+
+        predicate = compile_query(query)
+        return sum(1 for doc in self._candidates(query) if predicate(doc))
+
     def find_one(self, query: dict):
-        for doc in self.data:
-            if all(doc.get(k) == v for k, v in query.items()):
+        predicate = compile_query(query)
+        for doc in self._candidates(query):
+            if predicate(doc):
                 return doc
             
         return None  
-        
@@ -0,0 +1,82 @@
+import zstd
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Set in the length header of frames that are compressed, once per-frame flags are negotiated
+COMPRESSED_FLAG = 0x80000000
+
+class Compressor:
+    """
+    zstd for one connection. With the zstandard package the compression contexts (and a
+    dictionary, if any) are set up once and reused for every frame, without it every frame
+    goes through the plain zstd module. With `flags` frames smaller than `min_size` stay
+    uncompressed and the length header says which frames are compressed.
+    """
+
+    def __init__(self, level: int = 1, min_size: int = 0, dictionary: "zstandard.ZstdCompressionDict" = None, flags: bool = False):
+        self.level = level
+        self.min_size = min_size if flags else 0
+        self.flags = flags
+        self.dict_id = dictionary.dict_id() if dictionary is not None else None
+
+        if zstandard is not None:
+            self._cctx = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+            self._dctx = zstandard.ZstdDecompressor(dict_data=dictionary)
+        else:
+            self._cctx = None
+            self._dctx = None
+
+    def wants(self, size: int) -> bool:
+        return size >= self.min_size
+
+    def compress(self, data: bytes) -> bytes:
+        if self._cctx is not None:
+            return self._cctx.compress(data)
+        return zstd.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._dctx is not None:
+            return self._dctx.decompress(data)
+        return zstd.uncompress(data)
+
+    def header(self, size: int, compressed: bool) -> int:
+        return size | COMPRESSED_FLAG if compressed and self.flags else size
+
+    def parse_header(self, header: int) -> tuple[int, bool]:
+        """
+        Returns the payload length and whether the payload is compressed.
+        """
+        if not self.flags:
+            return header, True
+        return header & ~COMPRESSED_FLAG, bool(header & COMPRESSED_FLAG)
+
+def load_dictionary(data: bytes) -> "zstandard.ZstdCompressionDict":
+    if zstandard is None:
+        raise RuntimeError("zstd dictionaries need the zstandard package")
+    return zstandard.ZstdCompressionDict(data)
+
+def train_dictionary(samples: list[bytes], size: int = 16 * 1024) -> bytes:
+    """
+    Trains a dictionary on encoded documents, so small documents compress well on their own.
+    """
+    if zstandard is None:
+        raise RuntimeError("Training zstd dictionaries needs the zstandard package")
+    return zstandard.train_dictionary(size, samples).as_bytes()
+
+class Compression:
+    """
+    Server wide zstd settings, hands out a Compressor for every session that asks for zstd.
+    """
+
+    def __init__(self, level: int = 1, min_size: int = 256, dictionary: bytes = None):
+        self.level = level
+        self.min_size = min_size
+        self.dictionary = load_dictionary(dictionary) if dictionary else None
+        self.dict_id = self.dictionary.dict_id() if self.dictionary is not None else None
+
+    def compressor(self, flags: bool, dict_id: int = None) -> Compressor:
+        # Old clients compress every frame and know no dictionaries
+        dictionary = self.dictionary if flags and dict_id is not None and dict_id == self.dict_id else None
+        return Compressor(self.level, self.min_size, dictionary, flags)
@@ -0,0 +1,26 @@
+import uuid
+import itertools
+from typing import Iterator
+
+_EMPTY = object()
+
+class Cursor:
+    """
+    Server side state of a query whose result is sent in batches.
+    """
+
+    def __init__(self, docs: Iterator[dict]):
+        self.id = uuid.uuid4().hex
+        self.exhausted = False
+        self._docs = iter(docs)
+        self._next = _EMPTY
+
+    def next_batch(self, size: int) -> list[dict]:
+        batch = [] if self._next is _EMPTY else [self._next]
+        batch.extend(itertools.islice(self._docs, size - len(batch)))
+
+        # Looking one document ahead tells whether there is anything left
+        self._next = next(self._docs, _EMPTY)
+        if self._next is _EMPTY:
+            self.exhausted = True
+        return batch
@@ -36,6 +36,10 @@ class Database:
             json.dump([], f)
 
         coll = Collection(name, self)
+        # A log or indexes left behind by a dropped collection with the same name must not be picked up
+        for leftover in (coll.wal_path, coll.index_path):
+            if os.path.isfile(leftover):
+                os.remove(leftover)
         coll.load()
         self.collections[coll.name] = coll
             
@@ -48,15 +52,17 @@ class Database:
 
         return result
     
-    def delete_collection(self, name: str):
+    async def delete_collection(self, name: str):
         coll = self.get(name)
         if coll == None:
             return False
         
+        # Unlisted first, so checkpoints and appends that come after it leave the files alone
+        del self.collections[coll.name]
+        self.manager.query_cache.invalidate(coll)
         try:
-            coll.delete()
-            del self.collections[coll.name]
-        except:
+            await self.manager.drop(coll)
+        except OSError:
             pass
             
         return True
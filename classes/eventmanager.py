@@ -4,11 +4,30 @@ from .session import Session
 if typing.TYPE_CHECKING:
     from .manager import Manager
 
+def change_diff(old: dict, new: dict) -> dict:
+    """
+    Compact description of an update: only the top level fields that changed.
+    Unchanged values are still the same objects after an update, so most fields are settled by an identity check.
+    """
+    changed = {
+        key: value for key, value in new.items()
+        if key not in old or (old[key] is not value and old[key] != value)
+    }
+    removed = [key for key in old if key not in new]
+
+    return {
+        "@id": new["@id"],
+        "set": changed,
+        "unset": removed
+    }
+
 class EventManager:
     def __init__(self, manager: "Manager"):
         self.manager = manager
 
         self.subs: dict[Session, list[str]] = {}
+        # Sessions that get compact diffs instead of full documents
+        self.diff_subs: set[Session] = set()
         self.valid_events = [
             "db_create",
             "db_delete",
@@ -19,7 +38,7 @@ class EventManager:
             "doc_delete"
         ]
 
-    def sub(self, session: Session, events: list[str]):
+    def sub(self, session: Session, events: list[str], diff: bool = False):
         for event in events:
             if event.lower() not in self.valid_events:
                 continue
@@ -28,6 +47,11 @@ class EventManager:
 
             self.subs[session].append(event.lower())
 
+        if diff:
+            self.diff_subs.add(session)
+        else:
+            self.diff_subs.discard(session)
+
     def unsub(self, session: Session, events: list[str]):
         for event in events:
             if event.lower() not in self.valid_events:
@@ -37,17 +61,45 @@ class EventManager:
 
             self.subs[session].remove(event.lower())
 
-    def emit(self, event: str, data: dict):
-        asyncio.create_task(self._emit(event, data))
+    def remove(self, session: Session):
+        self.subs.pop(session, None)
+        self.diff_subs.discard(session)
+
+    def wants(self, event: str, diff: bool = None) -> bool:
+        """
+        Whether anyone is subscribed to the event, so callers can skip building its payload.
+        With `diff` set, only subscribers that want diffs (True) or full documents (False) count.
+        """
+        return any(
+            event in events and (diff is None or (session in self.diff_subs) == diff)
+            for session, events in self.subs.items()
+        )
+
+    def emit(self, event: str, data: dict, diff: dict = None):
+        """
+        Sends the event to its subscribers. `diff` is the compact payload for sessions
+        that subscribed with diffs, they get `data` if it isnt given.
+        """
+        asyncio.create_task(self._emit(event, data, diff))
+
+    def emit_many(self, event: str, data: list[dict], diffs: list[dict] = None):
+        """
+        Sends one event per payload, in order, like calling `emit` for each but with a single task.
+        """
+        asyncio.create_task(self._emit_many(event, data, diffs))
+
+    async def _emit_many(self, event: str, data: list[dict], diffs: list[dict] = None):
+        for i, payload in enumerate(data):
+            await self._emit(event, payload, diffs[i] if diffs != None else None)
 
-    async def _emit(self, event: str, data: dict):
+    async def _emit(self, event: str, data: dict, diff: dict = None):
         if event not in self.valid_events:
             await self.manager.log(("127.0.0.1", 0000), f"Warning: event to emit \"{event}\" is not a valid event, skipping")
             return
         
-        for client, events in self.subs.items():
+        for client, events in list(self.subs.items()):
             if event in events:
                 await client.operation("event", {
                     "ev": event,
-                    "d": data
+                    "d": diff if diff != None and client in self.diff_subs else data
                 })
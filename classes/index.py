@@ -0,0 +1,258 @@
+import json
+from bisect import bisect_left, bisect_right
+from .query import RANGE_OPERATORS, is_operator, get_path
+
+def index_key(value):
+    """
+    Turns a document value into something hashable. Keys are equal exactly when the values
+    compare equal in a query, so [1] and [1.0] or {"x": 1} and {"x": true} share a key.
+    """
+    if isinstance(value, list):
+        return ("@list", tuple(index_key(item) for item in value))
+    if isinstance(value, dict):
+        return ("@dict", frozenset((field, index_key(item)) for field, item in value.items()))
+    return value
+
+def index_name(fields: tuple[str, ...], type: str) -> str:
+    """
+    Builds the default name of an index. "_" joins the fields and ":" adds the type,
+    so both are escaped inside field names and no two indexes can end up with the same name.
+    """
+    escaped = "_".join(field.replace("\\", "\\\\").replace("_", "\\_").replace(":", "\\:") for field in fields)
+    return escaped if type == HashIndex.type else f"{escaped}:{type}"
+
+def sort_key(value) -> tuple:
+    """
+    Orders values of different types without comparing them directly:
+    null < numbers < strings < everything else.
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, json.dumps(value, sort_keys=True))
+
+class _Descending:
+    """
+    Inverts the order of a sort key so mixed directions fit into one key tuple.
+    """
+    __slots__ = ("key",)
+
+    def __init__(self, key: tuple):
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: "_Descending") -> bool:
+        return self.key == other.key
+
+def make_sort_key(sort: dict):
+    """
+    Builds a key function for a sort spec like {"total": -1, "name": 1}.
+    """
+    fields = [(field, direction < 0) for field, direction in sort.items()]
+
+    def key(doc: dict) -> tuple:
+        return tuple(
+            _Descending(sort_key(get_path(doc, field))) if descending else sort_key(get_path(doc, field))
+            for field, descending in fields
+        )
+    return key
+
+class HashIndex:
+    type = "hash"
+
+    def __init__(self, fields: list[str]):
+        self.fields = tuple(fields)
+        self.name = index_name(self.fields, self.type)
+        # key -> ids, the inner dict is used as an ordered set
+        self.entries: dict[tuple, dict[str, None]] = {}
+
+    def key(self, doc: dict) -> tuple:
+        return tuple(index_key(get_path(doc, field)) for field in self.fields)
+
+    def build(self, docs):
+        self.entries = {}
+        for doc in docs:
+            self.add(doc)
+
+    def add(self, doc: dict):
+        self.entries.setdefault(self.key(doc), {})[doc["@id"]] = None
+
+    def remove(self, doc: dict):
+        key = self.key(doc)
+        ids = self.entries.get(key)
+        if ids is None:
+            return
+        ids.pop(doc["@id"], None)
+        if not ids:
+            del self.entries[key]
+
+    def replace(self, old: dict, new: dict):
+        if self.key(old) != self.key(new):
+            self.remove(old)
+            self.add(new)
+
+    def covers(self, query: dict) -> bool:
+        return all(field in query and not is_operator(query[field]) for field in self.fields)
+
+    def _bucket(self, query: dict):
+        key = tuple(index_key(query[field]) for field in self.fields)
+        return self.entries.get(key, {})
+
+    def estimate(self, query: dict) -> int | None:
+        """
+        Number of candidates this index would return for the query, None if it cant serve it.
+        """
+        if not self.covers(query):
+            return None
+        return len(self._bucket(query))
+
+    def lookup(self, query: dict):
+        """
+        Returns the ids of all documents whose indexed fields equal the ones in the query.
+        """
+        return self._bucket(query).keys()
+
+    def spec(self) -> dict:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "fields": list(self.fields)
+        }
+
+class SortedIndex:
+    """
+    Keeps the documents ordered by a single field for range queries and sorting.
+    """
+    type = "sorted"
+
+    def __init__(self, fields: list[str]):
+        if len(fields) != 1:
+            raise ValueError("A sorted index covers exactly one field")
+
+        self.fields = tuple(fields)
+        self.field = fields[0]
+        self.name = index_name(self.fields, self.type)
+        # Parallel lists, keys stay sorted and ids[i] belongs to keys[i]
+        self.keys: list[tuple] = []
+        self.ids: list[str] = []
+
+    def key(self, doc: dict) -> tuple:
+        return sort_key(get_path(doc, self.field))
+
+    def build(self, docs):
+        entries = sorted((self.key(doc), doc["@id"]) for doc in docs)
+        self.keys = [key for key, _ in entries]
+        self.ids = [doc_id for _, doc_id in entries]
+
+    def add(self, doc: dict):
+        key = self.key(doc)
+        pos = bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.ids.insert(pos, doc["@id"])
+
+    def remove(self, doc: dict):
+        key = self.key(doc)
+        start = bisect_left(self.keys, key)
+        end = bisect_right(self.keys, key)
+        for pos in range(start, end):
+            if self.ids[pos] == doc["@id"]:
+                del self.keys[pos]
+                del self.ids[pos]
+                return
+
+    def replace(self, old: dict, new: dict):
+        if self.key(old) != self.key(new):
+            self.remove(old)
+            self.add(new)
+
+    def range(self, condition) -> tuple[int, int] | None:
+        """
+        Translates a condition on the indexed field into a slice of positions.
+        Returns None for conditions the index cant answer.
+        """
+        if not is_operator(condition):
+            key = sort_key(condition)
+            return bisect_left(self.keys, key), bisect_right(self.keys, key)
+
+        if not all(op in RANGE_OPERATORS for op in condition):
+            return None
+
+        bounds = dict(condition)
+        if "$between" in bounds:
+            low, high = bounds.pop("$between")
+            bounds["$gte"] = low
+            bounds["$lte"] = high
+
+        rank = None
+        for arg in bounds.values():
+            arg_rank = sort_key(arg)[0]
+            if arg_rank not in (1, 2):
+                return None
+            if rank is not None and rank != arg_rank:
+                # Bounds of different types, nothing can satisfy both
+                return 0, 0
+            rank = arg_rank
+
+        start = bisect_left(self.keys, (rank,))
+        end = bisect_left(self.keys, (rank + 1,))
+        for op, arg in bounds.items():
+            match op:
+                case "$gt":
+                    start = max(start, bisect_right(self.keys, (rank, arg)))
+                case "$gte":
+                    start = max(start, bisect_left(self.keys, (rank, arg)))
+                case "$lt":
+                    end = min(end, bisect_left(self.keys, (rank, arg)))
+                case "$lte":
+                    end = min(end, bisect_right(self.keys, (rank, arg)))
+                case _:
+                    return None
+
+        return start, max(start, end)
+
+    def estimate(self, query: dict) -> int | None:
+        if self.field not in query:
+            return None
+        bounds = self.range(query[self.field])
+        if bounds is None:
+            return None
+        return bounds[1] - bounds[0]
+
+    def lookup(self, query: dict):
+        start, end = self.range(query[self.field])
+        return self.ids[start:end]
+
+    def ordered(self, reverse: bool = False, query: dict = None):
+        """
+        Yields ids in index order, limited to the range of the query on the indexed field if possible.
+        """
+        start, end = 0, len(self.ids)
+        if query and self.field in query:
+            bounds = self.range(query[self.field])
+            if bounds is not None:
+                start, end = bounds
+
+        positions = range(end - 1, start - 1, -1) if reverse else range(start, end)
+        for pos in positions:
+            yield self.ids[pos]
+
+    def spec(self) -> dict:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "fields": list(self.fields)
+        }
+
+INDEX_TYPES = {
+    HashIndex.type: HashIndex,
+    SortedIndex.type: SortedIndex
+}
+
+def index_from_spec(spec: dict):
+    # The name is derived again, so indexes saved with an older, ambiguous name get the current one
+    return INDEX_TYPES[spec.get("type", HashIndex.type)](spec["fields"])
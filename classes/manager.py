@@ -1,33 +1,73 @@
 import os
-import json
+import time
 import asyncio
+import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from .db import Database
-from .collection import Collection
+from .collection import Collection, WriteConcern
+from . import codec
 from .ratelimit import RateLimiter
 from .eventmanager import EventManager
 from .security import UserManagement
+from .query import plan_cache_stats
+from .cache import QueryCache
+from .compression import Compression
+
+logger = logging.getLogger(__name__)
 
 class Manager:
-    def __init__(self, save_dir: str):
+    def __init__(
+        self,
+        save_dir: str,
+        checkpoint_interval: int = 300,
+        checkpoint_size: int = 16 * 1024 * 1024,
+        save_window: float = 0.05,
+        save_workers: int = 4,
+        query_cache_size: int = 64 * 1024 * 1024,
+        compression: Compression = None,
+        log_stdout: bool = True
+    ):
         self.save_dir = save_dir
+        # Off when embedded, the lines go to the logger instead of the host application's stdout
+        self.log_stdout = log_stdout
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_size = checkpoint_size
+        self.save_window = save_window
         self.dbs: dict[str, Database] = dict()
         self.userm = UserManagement(self.save_dir)
         self.ratelimiter = RateLimiter(auth_limit=3, interval=60, delay=10)
         self.event_manager = EventManager(self)
+        self.query_cache = QueryCache(query_cache_size)
+        self.compression = compression or Compression()
 
         self._log_queue = asyncio.Queue()
-        self._save_queue = asyncio.Queue()
-        self._save_lock = asyncio.Lock()
+        self._dirty: set[Collection] = set()
+        self._dirty_event = asyncio.Event()
+        self._pending: dict[Collection, list[bytes]] = {}
+        self._waiters: dict[Collection, list[asyncio.Future]] = {}
+        self._fsync: set[Collection] = set()
+        self._urgent = False
+        self._save_locks: dict[Collection, asyncio.Lock] = {}
+        self._save_pool = ThreadPoolExecutor(max_workers=save_workers, thread_name_prefix="jsondb-save")
+        self._save_stats = {
+            "flushes": 0,
+            "records": 0,
+            "total_latency": 0.0,
+            "max_latency": 0.0,
+            "last_latency": 0.0
+        }
 
         self._log_task = None
         self._save_task = None
+        self._checkpoint_task = None
 
     def init(self):
         self.userm.init()
 
         self._log_task = asyncio.create_task(self._log_worker())
         self._save_task = asyncio.create_task(self._save_worker())
+        self._checkpoint_task = asyncio.create_task(self._checkpoint_worker())
         self.ratelimiter.start()
 
         for dir in os.scandir(f"{self.save_dir}/files"):
@@ -39,6 +79,8 @@ class Manager:
     def stop(self):
         self._log_task.cancel()
         self._save_task.cancel()
+        self._checkpoint_task.cancel()
+        self._save_pool.shutdown(wait=True)
         self.ratelimiter.stop()
 
     def create_db(self, name: str):
@@ -88,25 +130,196 @@ class Manager:
     async def log(self, addr: tuple, msg: str, db: str = None, coll: str = None):
         await self._log_queue.put((addr, msg, db, coll))
 
-    async def save(self, collection: "Collection"):
-        await self._save_queue.put((collection))
+    async def save(self, collection: "Collection", record: dict, concern: str = WriteConcern.NONE):
+        """
+        Queues a log record. With the "buffered" or "fsync" write concern this waits until the
+        record was written (and synced). All waiters of a collection share one write and one fsync.
+        """
+        # Serialized right away so later in-place changes to the documents cant leak into the record
+        self._pending.setdefault(collection, []).append(codec.dumps_exact(record) + b"\n")
+        self._dirty.add(collection)
+
+        if concern == WriteConcern.NONE:
+            self._dirty_event.set()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(collection, []).append(future)
+        if concern == WriteConcern.FSYNC:
+            self._fsync.add(collection)
+
+        # Someone is waiting, dont sit out the save window
+        self._urgent = True
+        self._dirty_event.set()
+        await future
+
+    async def flush(self, collection: "Collection" = None):
+        """
+        Writes pending log records right away instead of waiting for the save window.
+        Flushes every dirty collection if none is given.
+        """
+        if collection is None:
+            collections = list(self._dirty)
+            self._dirty.clear()
+        else:
+            collections = [collection]
+            self._dirty.discard(collection)
+
+        await asyncio.gather(*(self._flush(coll) for coll in collections))
+
+    def stats(self) -> dict:
+        return {
+            "save": self.save_stats(),
+            "query_plans": plan_cache_stats(),
+            "query_cache": self.query_cache.stats()
+        }
+
+    def save_stats(self) -> dict:
+        stats = self._save_stats
+        return {
+            "dirty_collections": len(self._dirty),
+            "pending_records": sum(len(lines) for lines in self._pending.values()),
+            "flushes": stats["flushes"],
+            "records": stats["records"],
+            "avg_flush_latency": stats["total_latency"] / stats["flushes"] if stats["flushes"] else 0.0,
+            "max_flush_latency": stats["max_latency"],
+            "last_flush_latency": stats["last_latency"]
+        }
+
+    def _save_lock(self, collection: "Collection") -> asyncio.Lock:
+        lock = self._save_locks.get(collection)
+        if lock is None:
+            lock = self._save_locks[collection] = asyncio.Lock()
+        return lock
+
+    async def checkpoint(self, collection: "Collection"):
+        async with self._save_lock(collection):
+            if collection.db.get(collection.name) is not collection:
+                # Dropped while waiting for the lock, writing now would bring its files back
+                return
+            # Holding the lock keeps the log untouched until it got truncated, records that
+            # queue up meanwhile are appended afterwards and replay idempotently
+            docs = list(collection.data.values())
+            await asyncio.to_thread(self._save_sync, collection, docs)
+            if collection.db.get(collection.name) is not collection:
+                collection.drop()
+                return
+            collection.wal_size = 0
+            collection.last_checkpoint = time.monotonic()
+
+    async def drop(self, collection: "Collection"):
+        """
+        Removes the files of a collection that is no longer listed in its database. Waits
+        for a running checkpoint or append, so they cant recreate the files afterwards.
+        """
+        async with self._save_lock(collection):
+            collection.drop()
+        self._save_locks.pop(collection, None)
+
+    def _save_sync(self, collection: "Collection", docs: list[dict]):
+        tmp_path = f"{collection.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(codec.dumps_exact(docs))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, collection.path)
 
-    def _save_sync(collection: "Collection"):
-        with open(collection.path, "w") as f:
-            json.dump(collection.data, f)
+        # The snapshot is in place, a crash before the truncate just replays the old log again
+        open(collection.wal_path, "w").close()
+
+    def _append_sync(self, collection: "Collection", lines: list[bytes], fsync: bool):
+        data = b"".join(lines)
+        with open(collection.wal_path, "ab") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        collection.wal_size += len(data)
+
+    async def _flush(self, collection: "Collection"):
+        async with self._save_lock(collection):
+            lines = self._pending.pop(collection, None)
+            waiters = self._waiters.pop(collection, [])
+            fsync = collection in self._fsync
+            self._fsync.discard(collection)
+            if not lines:
+                return
+            if collection.db.get(collection.name) is not collection:
+                # Dropped while its records were waiting
+                self._save_locks.pop(collection, None)
+                self._resolve(waiters)
+                return
+
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._save_pool, self._append_sync, collection, lines, fsync)
+            except OSError as e:
+                # Keep the records for the next attempt, but let the waiters know
+                self._pending[collection] = lines + self._pending.get(collection, [])
+                self._dirty.add(collection)
+                self._resolve(waiters, e)
+                raise
+            latency = time.perf_counter() - start
+            self._resolve(waiters)
+
+            stats = self._save_stats
+            stats["flushes"] += 1
+            stats["records"] += len(lines)
+            stats["total_latency"] += latency
+            stats["last_latency"] = latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+
+    def _resolve(self, waiters: list[asyncio.Future], error: Exception = None):
+        for future in waiters:
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
 
     async def _save_worker(self):
         while True:
-            collection = await self._save_queue.get()
+            await self._dirty_event.wait()
+            if not self._urgent:
+                # Debounce, writes that arrive during the window end up in the same append
+                await asyncio.sleep(self.save_window)
+            self._urgent = False
+            self._dirty_event.clear()
+
             try:
-                async with self._save_lock:
-                    await asyncio.to_thread(self._save_sync, collection)
-            finally:
-                self._save_queue.task_done()
+                await self.flush()
+            except OSError as e:
+                await self.log(("127.0.0.1", 0000), f"Saving failed: {e}")
+
+    async def _checkpoint_worker(self):
+        while True:
+            await asyncio.sleep(min(self.checkpoint_interval, 5))
+
+            now = time.monotonic()
+            for db in list(self.dbs.values()):
+                for collection in list(db.collections.values()):
+                    if collection.wal_size == 0:
+                        continue
+                    if collection.wal_size < self.checkpoint_size and now - collection.last_checkpoint < self.checkpoint_interval:
+                        continue
+                    if db.get(collection.name) is not collection:
+                        continue
+
+                    try:
+                        await self.checkpoint(collection)
+                    except Exception as e:
+                        # One bad snapshot must not stop checkpoints of every other collection
+                        await self.log(("127.0.0.1", 0000), f"Checkpoint failed: {e}", db.db_name, collection.name)
 
     async def _log_worker(self):
         while True:
             addr, msg, db, collection = await self._log_queue.get()
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{timestamp}] [{addr[0]}:{addr[1]}]{f'/{db}' if db != None else ''}{f'/{collection}' if collection != None else ''} {msg}")   
+            line = f"[{addr[0]}:{addr[1]}]{f'/{db}' if db != None else ''}{f'/{collection}' if collection != None else ''} {msg}"
+            if self.log_stdout:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{timestamp}] {line}")
+            else:
+                logger.info(line)
             self._log_queue.task_done()
@@ -0,0 +1,78 @@
+import asyncio
+import typing
+
+class Mode:
+    READ = "read"
+    WRITE = "write"
+    BARRIER = "barrier"
+
+class Pipeline:
+    """
+    Runs the requests of one session concurrently while keeping the order that matters.
+    Reads run in parallel, but after earlier writes to their collection. Writes wait for
+    every earlier request on their collection. Barriers wait for everything before them
+    and hold back everything after them. At most `window` requests are in flight.
+    """
+
+    def __init__(self, window: int):
+        self.window = asyncio.Semaphore(window)
+        self.tasks: set[asyncio.Task] = set()
+
+        self._writes: dict[typing.Hashable, asyncio.Task] = {}
+        self._reads: dict[typing.Hashable, set[asyncio.Task]] = {}
+
+    async def submit(self, mode: str, key: typing.Hashable, coro: typing.Coroutine):
+        """
+        Schedules a request. Returns once it may be followed by the next one, which is
+        right away for reads and writes and after it completed for barriers.
+        """
+        if mode == Mode.BARRIER:
+            await self.drain()
+            await coro
+            return
+
+        # A full window stops reading from the socket, so the client feels the backpressure
+        await self.window.acquire()
+
+        prior = []
+        if key in self._writes:
+            prior.append(self._writes[key])
+        if mode == Mode.WRITE:
+            prior.extend(self._reads.pop(key, ()))
+
+        task = asyncio.create_task(self._run(prior, coro))
+        if mode == Mode.WRITE:
+            self._writes[key] = task
+        else:
+            self._reads.setdefault(key, set()).add(task)
+        self.tasks.add(task)
+        task.add_done_callback(lambda task: self._done(key, task))
+
+    async def _run(self, prior: list[asyncio.Task], coro: typing.Coroutine):
+        try:
+            if prior:
+                await asyncio.wait(prior)
+        except asyncio.CancelledError:
+            coro.close()
+            raise
+
+        await coro
+
+    def _done(self, key: typing.Hashable, task: asyncio.Task):
+        self.window.release()
+        self.tasks.discard(task)
+        if self._writes.get(key) is task:
+            del self._writes[key]
+        reads = self._reads.get(key)
+        if reads is not None:
+            reads.discard(task)
+            if not reads:
+                del self._reads[key]
+
+    async def drain(self):
+        while self.tasks:
+            await asyncio.wait(list(self.tasks))
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
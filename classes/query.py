@@ -0,0 +1,232 @@
+from functools import lru_cache
+
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte", "$between")
+OPERATORS = RANGE_OPERATORS + ("$ne", "$in", "$nin", "$exists")
+
+_MISSING = object()
+_NUMBERS = frozenset((int, float, bool))
+
+def is_operator(value) -> bool:
+    """
+    A condition like {"$gt": 5}. Plain objects without "$" keys are compared for equality.
+    """
+    return isinstance(value, dict) and len(value) > 0 and all(type(k) == str and k.startswith("$") for k in value)
+
+def get_path(doc: dict, path: str, default=None):
+    """
+    Resolves a dotted path like "address.city" through nested objects.
+    """
+    if "." not in path:
+        return doc.get(path, default)
+
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return default
+        value = value.get(part, _MISSING)
+        if value is _MISSING:
+            return default
+    return value
+
+def project(doc: dict, projection: dict) -> dict:
+    """
+    Returns a copy of the document with only the fields set to 1, or without the fields set to 0.
+    "@id" is kept unless excluded explicitly.
+    """
+    include = any(keep for path, keep in projection.items() if path != "@id")
+    if not include:
+        result = dict(doc)
+        for path, keep in projection.items():
+            if keep:
+                continue
+            *parents, last = path.split(".")
+            target = result
+            for part in parents:
+                child = target.get(part)
+                if not isinstance(child, dict):
+                    break
+                # Copy on the way down, the stored document must stay untouched
+                child = dict(child)
+                target[part] = child
+                target = child
+            else:
+                target.pop(last, None)
+        return result
+
+    result = {}
+    if projection.get("@id", 1) and "@id" in doc:
+        result["@id"] = doc["@id"]
+    for path, keep in projection.items():
+        if not keep or path == "@id":
+            continue
+        value = get_path(doc, path, _MISSING)
+        if value is _MISSING:
+            continue
+        *parents, last = path.split(".")
+        target = result
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[last] = value
+    return result
+
+def validate_projection(projection) -> bool:
+    if not isinstance(projection, dict) or not projection:
+        return False
+    if not all(keep in (0, 1) for keep in projection.values()):
+        return False
+    # Either only includes or only excludes, "@id" can be excluded in both cases
+    return len({keep for path, keep in projection.items() if path != "@id"}) <= 1
+
+def validate(query) -> bool:
+    """
+    Checks the shape of a query before it runs, so operators with bad arguments cant fail halfway through.
+    """
+    if not isinstance(query, dict):
+        return False
+
+    for condition in query.values():
+        if not is_operator(condition):
+            continue
+        for op, arg in condition.items():
+            if op not in OPERATORS:
+                return False
+            if op == "$between" and (not isinstance(arg, list) or len(arg) != 2):
+                return False
+            if op in ("$in", "$nin") and not isinstance(arg, list):
+                return False
+
+    return True
+
+def _kind(value) -> str:
+    if value.__class__ in _NUMBERS:
+        return "num"
+    if value.__class__ is str:
+        return "str"
+    return "any"
+
+def _split(query: dict) -> tuple[tuple, list]:
+    """
+    Separates a query into its shape (fields, operators and argument types) and the argument values.
+    Queries that only differ in their values share a shape and thus a compiled plan.
+    """
+    shape = []
+    params = []
+    for field, condition in query.items():
+        if not is_operator(condition):
+            shape.append((field, (("$eq", None),)))
+            params.append(condition)
+            continue
+
+        ops = []
+        for op, arg in condition.items():
+            if op == "$between":
+                ops.append(("$gte", _kind(arg[0])))
+                params.append(arg[0])
+                ops.append(("$lte", _kind(arg[1])))
+                params.append(arg[1])
+            elif op == "$exists":
+                # Baked into the plan, there are only two variants
+                ops.append(("$exists", bool(arg)))
+            else:
+                ops.append((op, _kind(arg) if op in RANGE_OPERATORS else None))
+                params.append(arg)
+        shape.append((field, tuple(ops)))
+
+    return tuple(shape), params
+
+_COMPARISONS = {
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<="
+}
+
+def _safe_compare(value, op: str, arg) -> bool:
+    try:
+        match op:
+            case "$gt":
+                return value > arg
+            case "$gte":
+                return value >= arg
+            case "$lt":
+                return value < arg
+            case "$lte":
+                return value <= arg
+    except TypeError:
+        return False
+
+def _condition(op: str, kind, var: str, param: str) -> str:
+    match op:
+        case "$eq":
+            return f"{var} == {param}"
+        case "$ne":
+            return f"{var} != {param}"
+        case "$in":
+            return f"{var} in {param}"
+        case "$nin":
+            return f"{var} not in {param}"
+
+    # Range, different types never match
+    if kind == "num":
+        return f"{var}.__class__ in _NUMBERS and {var} {_COMPARISONS[op]} {param}"
+    if kind == "str":
+        return f"{var}.__class__ is str and {var} {_COMPARISONS[op]} {param}"
+    return f"_safe_compare({var}, {op!r}, {param})"
+
+@lru_cache(maxsize=512)
+def _compile_shape(shape: tuple):
+    """
+    Generates the source of a predicate for a query shape and returns a function that
+    binds argument values to it. Field names and values are passed in, never pasted into the source.
+    """
+    lines = ["def bind(fields, params):"]
+    param_count = sum(1 for _, ops in shape for op, _ in ops if op != "$exists")
+    if param_count:
+        lines.append(f"    {', '.join(f'p{i}' for i in range(param_count))}, = params")
+    for i in range(len(shape)):
+        lines.append(f"    f{i} = fields[{i}]")
+    lines.append("    def predicate(doc):")
+
+    param = 0
+    for i, (field, ops) in enumerate(shape):
+        getter = "_get_path(doc, f{0}, _MISSING)" if "." in field else "doc.get(f{0}, _MISSING)"
+        lines.append(f"        v = {getter.format(i)}")
+        for op, arg in ops:
+            if op == "$exists":
+                lines.append(f"        if v is {'' if arg else 'not '}_MISSING: return False")
+        # Missing fields compare like null
+        lines.append("        if v is _MISSING: v = None")
+        for op, kind in ops:
+            if op == "$exists":
+                continue
+            lines.append(f"        if not ({_condition(op, kind, 'v', f'p{param}')}): return False")
+            param += 1
+
+    lines.append("        return True")
+    lines.append("    return predicate")
+
+    namespace = {
+        "_MISSING": _MISSING,
+        "_NUMBERS": _NUMBERS,
+        "_get_path": get_path,
+        "_safe_compare": _safe_compare
+    }
+    exec("\n".join(lines), namespace)
+    return namespace["bind"]
+
+def compile_query(query: dict):
+    """
+    Returns a predicate function for the query. The plan for the query shape is cached.
+    """
+    shape, params = _split(query or {})
+    fields = tuple(field for field, _ in shape)
+    return _compile_shape(shape)(fields, params)
+
+def plan_cache_stats() -> dict:
+    info = _compile_shape.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
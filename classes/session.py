@@ -1,11 +1,15 @@
-import json
-import zstd
 import struct
 import asyncio
+from . import codec
 from .db import Database
+from .cursor import Cursor
+from .compression import Compressor
 from .security import User
 
 HEADER_SIZE = 4 # Bytes
+MAX_CURSORS = 32
+# Buffered output beyond which senders wait for the socket to catch up
+OUTPUT_HIGH_WATER = 64 * 1024
 
 class Session:
     def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
@@ -13,19 +17,63 @@ class Session:
         self.writer = writer
 
         self.authed = False
-        self.zstd = False
+        # Set at auth if the client asked for zstd
+        self.compressor: Compressor = None
+        # Body encoding, switched at auth
+        self.codec = codec.JSON
         self.db: Database = None
         self.user: User = None
+        self.cursors: dict[str, Cursor] = {}
 
-    async def send(self, body: str):
-        encoded = body.encode()
-        if self.zstd:
-            encoded = zstd.compress(encoded, 1)
-        header = struct.pack(">I", len(encoded))
+        # Frames of the current loop tick, written together at the end of it
+        self._out: list[bytes] = []
+        self._out_size = 0
+        self._flush_handle: asyncio.Handle = None
 
-        body = header + encoded
-        self.writer.write(body)
-        await self.writer.drain()
+    async def send(self, body: bytes):
+        await self.send_raw(body)
+
+    async def send_raw(self, *parts: bytes):
+        """
+        Sends one frame made of already encoded parts. They are handed to the transport
+        as they are and only get joined when the frame has to be compressed. Frames sent
+        in the same loop tick go out in one write, the sender only waits for the socket
+        when too much output piled up.
+        """
+        size = sum(len(part) for part in parts)
+        compressor = self.compressor
+        if compressor is None:
+            header = struct.pack(">I", size)
+        elif compressor.wants(size):
+            parts = (compressor.compress(b"".join(parts)),)
+            header = struct.pack(">I", compressor.header(len(parts[0]), True))
+        else:
+            header = struct.pack(">I", compressor.header(size, False))
+
+        self._out.append(header)
+        self._out.extend(parts)
+        self._out_size += len(header) + sum(len(part) for part in parts)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self.flush)
+
+        if self._out_size + self.writer.transport.get_write_buffer_size() > OUTPUT_HIGH_WATER:
+            self.flush()
+            await self.writer.drain()
+
+    def flush(self):
+        """
+        Hands the buffered frames to the transport.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._out:
+            return
+
+        out = self._out
+        self._out = []
+        self._out_size = 0
+        self.writer.writelines(out)
 
     async def read(self):
         try:
@@ -34,10 +82,14 @@ class Session:
             return None
         
         msg_len = struct.unpack(">I", header)[0]
+        compressed = False
+        if self.compressor is not None:
+            msg_len, compressed = self.compressor.parse_header(msg_len)
+
         data = await self.reader.readexactly(msg_len)
-        if self.zstd:
-            data = zstd.uncompress(data)
-        return data.decode()
+        if compressed:
+            data = self.compressor.decompress(data)
+        return data
 
     async def error(self, details: str, data_id = None):
         resp = {
@@ -46,8 +98,15 @@ class Session:
         if data_id != None:
             resp["id"] = data_id
 
-        await self.send(json.dumps(resp))
+        await self.send(self.codec.dumps(resp))
         
+    async def operation_raw(self, op: str, d: bytes, data_id: str = None):
+        """
+        Like operation, but "d" is already encoded with the session codec. The request id
+        is spliced in front of it, so cached bytes can be sent without serializing them again.
+        """
+        await self.send_raw(self.codec.head(op, data_id), d, self.codec.tail)
+
     async def operation(self, op: str, d: dict = None, data_id: str = None):
         resp = {
             "op": op
@@ -57,4 +116,23 @@ class Session:
         if d != None:
             resp["d"] = d
             
-        await self.send(json.dumps(resp))
+        await self.send(self.codec.dumps(resp))
+
+class LocalSession(Session):
+    """
+    A session inside the client's own process. Replies are decoded and handed to
+    `deliver` instead of being written to a socket.
+    """
+
+    def __init__(self, deliver):
+        super().__init__(None, None)
+        self.deliver = deliver
+
+    async def send_raw(self, *parts: bytes):
+        await self.deliver(self.codec.loads(b"".join(parts)))
+
+    def flush(self):
+        pass
+
+    async def read(self):
+        return None
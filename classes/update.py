@@ -0,0 +1,113 @@
+from .query import compile_query, is_operator, validate
+
+UPDATE_OPERATORS = ("$set", "$unset", "$inc", "$push", "$pull")
+
+def is_operator_update(updates: dict) -> bool:
+    return any(type(key) == str and key.startswith("$") for key in updates)
+
+def validate_update(updates) -> bool:
+    """
+    Either a plain object that is merged into the documents, or only update operators.
+    """
+    if not isinstance(updates, dict) or not updates:
+        return False
+    if not is_operator_update(updates):
+        return True
+
+    for op, fields in updates.items():
+        if op not in UPDATE_OPERATORS or not isinstance(fields, dict) or not fields:
+            return False
+        for path, value in fields.items():
+            if path == "@id" or path.startswith("@id."):
+                return False
+            if op == "$inc" and value.__class__ not in (int, float):
+                return False
+            if op == "$push" and isinstance(value, dict) and "$each" in value and not isinstance(value["$each"], list):
+                return False
+            if op == "$pull" and is_operator(value) and not validate({"v": value}):
+                # Conditions are compiled when the update runs, a bad one would fail halfway through
+                return False
+
+    return True
+
+class _Writer:
+    """
+    Copy-on-write access to a document: every nested object on a changed path is copied
+    once, everything else stays shared with the original.
+    """
+
+    def __init__(self, doc: dict):
+        self.doc = dict(doc)
+        self._copied = {id(self.doc)}
+
+    def parent(self, path: str, create: bool) -> tuple[dict | None, str]:
+        *parents, last = path.split(".")
+        target = self.doc
+        for part in parents:
+            child = target.get(part)
+            if child is None and create:
+                child = {}
+            elif not isinstance(child, dict):
+                # Missing, or a value that cant hold fields
+                return None, last
+            elif id(child) not in self._copied:
+                child = dict(child)
+            self._copied.add(id(child))
+            target[part] = child
+            target = child
+        return target, last
+
+def apply_update(doc: dict, updates: dict) -> dict:
+    """
+    Returns a new document with the updates applied. The given document is not changed.
+    """
+    if not is_operator_update(updates):
+        new = dict(doc)
+        new.update(updates)
+        return new
+
+    writer = _Writer(doc)
+    for op, fields in updates.items():
+        for path, value in fields.items():
+            target, key = writer.parent(path, create=op in ("$set", "$inc", "$push"))
+            if target is None:
+                continue
+
+            match op:
+                case "$set":
+                    target[key] = value
+                case "$unset":
+                    target.pop(key, None)
+                case "$inc":
+                    current = target.get(key, 0)
+                    # Fields that arent numbers stay as they are
+                    if current.__class__ in (int, float):
+                        target[key] = current + value
+                case "$push":
+                    current = target.get(key, [])
+                    if isinstance(current, list):
+                        items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                        target[key] = current + items
+                case "$pull":
+                    current = target.get(key)
+                    if isinstance(current, list):
+                        if is_operator(value):
+                            predicate = compile_query({"v": value})
+                            target[key] = [item for item in current if not predicate({"v": item})]
+                        else:
+                            target[key] = [item for item in current if item != value]
+
+    return writer.doc
+
+def upsert_document(query: dict, updates: dict) -> dict:
+    """
+    Builds the document inserted by an upsert: the equality conditions of the query with the updates applied.
+    """
+    base = _Writer({})
+    for path, condition in query.items():
+        if path == "@id" or is_operator(condition):
+            continue
+        target, key = base.parent(path, create=True)
+        target[key] = condition
+
+    return apply_update(base.doc, updates)
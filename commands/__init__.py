@@ -1,16 +1,58 @@
 from .base import Command
+from .registry import CommandRegistry, Handler
+from .aggregate import Aggregate
 from .auth import Auth
+from .count_doc import CountDoc
 from .create_collection import CreateCollection
 from .create_db import CreateDb
+from .create_index import CreateIndex
 from .delete_collection import DeleteCollection
 from .delete_db import DeleteDb
 from .delete_doc import DeleteDoc
+from .delete_many import DeleteMany
+from .drop_index import DropIndex
 from .event_sub import EventSub
 from .event_unsub import EventUnsub
 from .find_all_doc import FindAllDoc
 from .find_one_doc import FindOneDoc
+from .get_more import GetMore
 from .insert_doc import InsertDoc
+from .insert_many import InsertMany
+from .kill_cursor import KillCursor
 from .list_collections import ListCollections
 from .list_db import ListDb
+from .list_indexes import ListIndexes
 from .open_db import OpenDb
+from .stats import Stats
 from .update_doc import UpdateDoc
+from .update_many import UpdateMany
+
+# Every command the server answers, the registries of main and the embedded mode are built from it
+COMMANDS: list[type[Command]] = [
+    Aggregate,
+    Auth,
+    CountDoc,
+    CreateCollection,
+    CreateDb,
+    CreateIndex,
+    DeleteCollection,
+    DeleteDb,
+    DeleteDoc,
+    DeleteMany,
+    DropIndex,
+    EventSub,
+    EventUnsub,
+    FindAllDoc,
+    FindOneDoc,
+    GetMore,
+    InsertDoc,
+    InsertMany,
+    KillCursor,
+    ListCollections,
+    ListDb,
+    ListIndexes,
+    OpenDb,
+    Stats,
+    UpdateDoc,
+    UpdateMany
+]
@@ -0,0 +1,29 @@
+from .base import Command
+from classes import Manager, Session, Permissions, Mode
+from classes.aggregation import aggregate
+
+class Aggregate(Command):
+    name = "aggregate"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.READ
+    mode = Mode.READ
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")       
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        pipeline = data_d.get("pipeline")
+        try:
+            result = aggregate(coll, pipeline)
+        except ValueError:
+            await session.error("format", data_id)
+            return
+
+        await session.operation("ok", {"result": result}, data_id=data_id)
@@ -1,5 +1,5 @@
 from .base import Command
-from classes import Manager, Session
+from classes import Manager, Session, codec
 
 class Auth(Command):
     name = "auth"
@@ -16,6 +16,12 @@ class Auth(Command):
         name = request.get("d", {}).get("name") or ""
         password = request.get("d", {}).get("password") or ""
         zstd = request.get("d", {}).get("zstd") or False
+        # Clients that understand the compressed flag in the frame header, and their dictionary
+        zstd_flags = request.get("d", {}).get("zstd_flags") or False
+        zstd_dict = request.get("d", {}).get("zstd_dict")
+        # Unknown or unavailable encodings fall back to JSON, the reply tells the client what it got
+        encoding = request.get("d", {}).get("encoding")
+        encoding = codec.CODECS.get(encoding, codec.JSON) if type(encoding) == str else codec.JSON
         
         user = manager.get_user(name)
         if user == None:
@@ -32,6 +38,12 @@ class Auth(Command):
         manager.ratelimiter.register_auth_attempt(addr[0], True)
         manager.event_manager.subs[session] = []
 
-        await session.operation("authed", data_id=data_id)
-        session.zstd = zstd
+        compressor = manager.compression.compressor(zstd_flags, zstd_dict) if zstd else None
+        await session.operation("authed", {
+            "encoding": encoding.name,
+            "zstd_flags": compressor is not None and compressor.flags,
+            "zstd_dict": compressor.dict_id if compressor is not None else None
+        }, data_id=data_id)
+        session.compressor = compressor
+        session.codec = encoding
         await manager.log(addr, "authed")
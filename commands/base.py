@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from classes import Manager, Session
+from classes import Manager, Session, Mode
 
 class Command(ABC):
     name: str
@@ -7,23 +7,27 @@ class Command(ABC):
     requires_db: bool
     requires_coll: bool
     permission: str = None
-
-    @classmethod
-    async def check_requirements(cls, session: Session, manager: Manager, request: dict) -> bool:
-        if cls.requires_login and not session.authed:
-            await session.error("unauthed", request.get("id"))
-            return False
-        if cls.requires_db and not session.db:
-            await session.error("non_open", request.get("id"))
-            return False
-        if cls.requires_coll and not (session.db and request.get("d", {}).get("collection")):
-            await session.error("format", request.get("id"))
-            return False
-        if cls.permission and not session.user.has_permission(cls.permission, session.db.db_name if session.db else None):
-            await session.error("permissions", request.get("id"))
-            return False
-        return True
+    # How the request is ordered against the other requests of its session
+    mode: str = Mode.BARRIER
 
     @abstractmethod
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         pass
+
+def split_bulk(items: list, check, ordered: bool) -> tuple[list, list[dict]]:
+    """
+    Validates the items of a bulk request. Ordered requests stop at the first invalid item,
+    unordered ones skip invalid items and carry on. Returns the valid items and the errors.
+    """
+    valid = []
+    errors = []
+    for i, item in enumerate(items):
+        if check(item):
+            valid.append(item)
+            continue
+
+        errors.append({"index": i, "error": "format"})
+        if ordered:
+            break
+
+    return valid, errors
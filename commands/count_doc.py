@@ -0,0 +1,27 @@
+from .base import Command
+from classes import Manager, Session, Permissions, Mode
+from classes.query import validate
+
+class CountDoc(Command):
+    name = "count_doc"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.READ
+    mode = Mode.READ
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")       
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        query = data_d.get("query") or {}
+        if not validate(query):
+            await session.error("format", data_id)
+            return
+
+        await session.operation("ok", {"result": coll.count(query)}, data_id=data_id)
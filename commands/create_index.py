@@ -0,0 +1,38 @@
+from .base import Command
+from classes import Manager, Session, Permissions, Mode
+from classes.index import INDEX_TYPES
+
+class CreateIndex(Command):
+    name = "create_index"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.WRITE
+    mode = Mode.WRITE
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        fields = data_d.get("fields")
+        if not fields or type(fields) != list or not all(type(field) == str for field in fields):
+            await session.error("format", data_id)
+            return
+
+        index_type = data_d.get("type", "hash")
+        if index_type not in INDEX_TYPES or (index_type == "sorted" and len(fields) != 1):
+            await session.error("format", data_id)
+            return
+
+        name = coll.create_index(fields, index_type)
+        if name == None:
+            await session.error("exists", data_id)
+            return
+
+        await session.operation("ok", {"result": name}, data_id=data_id)
+        await manager.log(addr, f"create index {name}", session.db.db_name, coll.name)
@@ -16,7 +16,7 @@ class DeleteCollection(Command):
             return
         
         name = data_d.get("name")
-        if session.db.delete_collection(name):
+        if await session.db.delete_collection(name):
             await session.operation("ok", data_id=data_id)
             manager.event_manager.emit("coll_delete", {
                 "name": name
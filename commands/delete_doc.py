@@ -1,5 +1,6 @@
 from .base import Command
-from classes import Manager, Session, Permissions
+from classes import Manager, Session, Permissions, WriteConcern, Mode
+from classes.query import validate
 
 class DeleteDoc(Command):
     name = "delete_doc"
@@ -7,6 +8,7 @@ class DeleteDoc(Command):
     requires_db = True
     requires_coll = True
     permission = Permissions.WRITE
+    mode = Mode.WRITE
 
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         data_id = request.get("id")    
@@ -22,15 +24,29 @@ class DeleteDoc(Command):
         coll = session.db.get(coll)
         
         query = data_d.get("query")
-        if not query:
+        if not query or not validate(query):
             await session.error("format", data_id)
             return
         
-        docs = await coll.delete(coll, query)
+        concern = data_d.get("write_concern", WriteConcern.NONE)
+        if concern not in WriteConcern.ALL:
+            await session.error("format", data_id)
+            return
+
+        try:
+            docs = await coll.delete(query, concern)
+        except OSError:
+            await session.error("write_failed", data_id)
+            return
         
         await session.operation("ok", data_id=data_id)
-        manager.event_manager.emit("doc_delete", {
-            "doc": docs
-        })
+        events = manager.event_manager
+        if docs and events.wants("doc_delete"):
+            full = {
+                "doc": docs
+            } if events.wants("doc_delete", diff=False) else None
+            events.emit("doc_delete", full, {
+                "ids": [doc["@id"] for doc in docs]
+            })
         
         await manager.log(addr, f"delete", session.db.db_name, coll.name)
@@ -0,0 +1,53 @@
+from .base import Command, split_bulk
+from classes import Manager, Session, Permissions, WriteConcern, Mode
+from classes.query import validate
+
+class DeleteMany(Command):
+    name = "delete_many"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.WRITE
+    mode = Mode.WRITE
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        queries = data_d.get("queries")
+        if not queries or type(queries) != list:
+            await session.error("format", data_id)
+            return
+
+        concern = data_d.get("write_concern", WriteConcern.NONE)
+        if concern not in WriteConcern.ALL:
+            await session.error("format", data_id)
+            return
+
+        queries, errors = split_bulk(queries, lambda query: bool(query) and validate(query), data_d.get("ordered", True))
+
+        try:
+            docs = await coll.delete_many(queries, concern)
+        except OSError:
+            await session.error("write_failed", data_id)
+            return
+
+        await session.operation("ok", {"result": {
+            "deleted": len(docs),
+            "errors": errors
+        }}, data_id=data_id)
+        events = manager.event_manager
+        if docs and events.wants("doc_delete"):
+            full = {
+                "doc": docs
+            } if events.wants("doc_delete", diff=False) else None
+            events.emit("doc_delete", full, {
+                "ids": [doc["@id"] for doc in docs]
+            })
+
+        await manager.log(addr, f"delete_many {len(docs)}", session.db.db_name, coll.name)
@@ -0,0 +1,31 @@
+from .base import Command
+from classes import Manager, Session, Permissions, Mode
+
+class DropIndex(Command):
+    name = "drop_index"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.WRITE
+    mode = Mode.WRITE
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        name = data_d.get("name")
+        if not name:
+            await session.error("format", data_id)
+            return
+
+        if not coll.drop_index(name):
+            await session.error("doesnt_exist", data_id)
+            return
+
+        await session.operation("ok", data_id=data_id)
+        await manager.log(addr, f"drop index {name}", session.db.db_name, coll.name)
@@ -19,6 +19,6 @@ class EventSub(Command):
             await session.error("format", data_id)
             return
 
-        manager.event_manager.sub(session, events)
+        manager.event_manager.sub(session, events, bool(data_d.get("diff")))
 
         await session.operation("ok", data_id=data_id)
@@ -1,5 +1,8 @@
 from .base import Command
-from classes import Manager, Session, Permissions
+from classes import Manager, Session, Permissions, Cursor, Mode
+from classes.session import MAX_CURSORS
+from classes.query import validate, validate_projection
+from classes.cache import cache_key
 
 class FindAllDoc(Command):
     name = "find_all_doc"
@@ -7,6 +10,7 @@ class FindAllDoc(Command):
     requires_db = True
     requires_coll = True
     permission = Permissions.READ
+    mode = Mode.READ
 
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         data_id = request.get("id")    
@@ -16,14 +20,55 @@ class FindAllDoc(Command):
             await session.error("format", data_id)
             return
         
-        if session.db.collection_exists(coll) == None:
+        if not session.db.collection_exists(coll):
             await session.error("doesnt_exist", data_id)
             return
         coll = session.db.get(coll)
         
-        query = data_d.get("query")
-        if not query:
+        query = data_d.get("query") or {}
+        if not validate(query):
+            await session.error("format", data_id)
+            return
+
+        sort = data_d.get("sort")
+        if sort != None and (type(sort) != dict or not all(direction in (1, -1) for direction in sort.values())):
+            await session.error("format", data_id)
+            return
+
+        limit = data_d.get("limit")
+        skip = data_d.get("skip") or 0
+        if (limit != None and (type(limit) != int or limit < 0)) or type(skip) != int or skip < 0:
+            await session.error("format", data_id)
+            return
+
+        projection = data_d.get("projection")
+        if projection != None and not validate_projection(projection):
             await session.error("format", data_id)
             return
         
-        await session.operation("ok", {"result": coll.find_one(query)}, data_id=data_id)
+        batch_size = data_d.get("batch_size")
+        if batch_size == None:
+            key = cache_key(session.codec.name, FindAllDoc.name, query, sort, limit, skip, projection)
+            encoded = manager.query_cache.get(coll, key)
+            if encoded is None:
+                encoded = session.codec.dumps({"result": coll.find_all(query, sort, limit, skip, projection)})
+                manager.query_cache.put(coll, key, encoded)
+            await session.operation_raw("ok", encoded, data_id=data_id)
+            return
+
+        if type(batch_size) != int or batch_size <= 0:
+            await session.error("format", data_id)
+            return
+        if len(session.cursors) >= MAX_CURSORS:
+            await session.error("too_many_cursors", data_id)
+            return
+
+        cursor = Cursor(coll.find_iter(query, sort, limit, skip, projection))
+        batch = cursor.next_batch(batch_size)
+        if not cursor.exhausted:
+            session.cursors[cursor.id] = cursor
+
+        await session.operation("ok", {
+            "result": batch,
+            "cursor": None if cursor.exhausted else cursor.id
+        }, data_id=data_id)
@@ -1,5 +1,7 @@
 from .base import Command
-from classes import Manager, Session, Permissions
+from classes import Manager, Session, Permissions, Mode
+from classes.query import validate
+from classes.cache import cache_key
 
 class FindOneDoc(Command):
     name = "find_one_doc"
@@ -7,6 +9,7 @@ class FindOneDoc(Command):
     requires_db = True
     requires_coll = True
     permission = Permissions.READ
+    mode = Mode.READ
 
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         data_id = request.get("id")    
@@ -22,8 +25,13 @@ class FindOneDoc(Command):
         coll = session.db.get(coll)
         
         query = data_d.get("query")
-        if not query:
+        if not query or not validate(query):
             await session.error("format", data_id)
             return
         
-        await session.operation("ok", {"result": coll.find_one(query)}, data_id=data_id)
+        key = cache_key(session.codec.name, FindOneDoc.name, query)
+        encoded = manager.query_cache.get(coll, key)
+        if encoded is None:
+            encoded = session.codec.dumps({"result": coll.find_one(query)})
+            manager.query_cache.put(coll, key, encoded)
+        await session.operation_raw("ok", encoded, data_id=data_id)
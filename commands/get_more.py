@@ -0,0 +1,36 @@
+from .base import Command
+from classes import Manager, Session, Permissions, Mode
+
+class GetMore(Command):
+    name = "get_more"
+    requires_login = True
+    requires_db = True
+    requires_coll = False
+    permission = Permissions.READ
+    mode = Mode.READ
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        if not data_d:
+            await session.error("format", data_id)
+            return
+
+        batch_size = data_d.get("batch_size")
+        if type(batch_size) != int or batch_size <= 0:
+            await session.error("format", data_id)
+            return
+
+        cursor = session.cursors.get(data_d.get("cursor"))
+        if cursor == None:
+            await session.error("cursor_not_found", data_id)
+            return
+
+        batch = cursor.next_batch(batch_size)
+        if cursor.exhausted:
+            session.cursors.pop(cursor.id, None)
+
+        await session.operation("ok", {
+            "result": batch,
+            "cursor": None if cursor.exhausted else cursor.id
+        }, data_id=data_id)
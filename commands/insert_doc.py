@@ -1,5 +1,5 @@
 from .base import Command
-from classes import Manager, Session, Permissions
+from classes import Manager, Session, Permissions, WriteConcern, Mode
 
 class InsertDoc(Command):
     name = "insert_doc"
@@ -7,6 +7,7 @@ class InsertDoc(Command):
     requires_db = True
     requires_coll = True
     permission = Permissions.WRITE
+    mode = Mode.WRITE
 
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         data_id = request.get("id")    
@@ -18,16 +19,26 @@ class InsertDoc(Command):
         coll = session.db.get(coll)
 
         _data = data_d.get("dict")
-        if not _data:
+        if not _data or not session.codec.storable(_data):
             await session.error("format", data_id)
             return
 
-        await coll.insert(_data)
+        concern = data_d.get("write_concern", WriteConcern.NONE)
+        if concern not in WriteConcern.ALL:
+            await session.error("format", data_id)
+            return
+
+        try:
+            await coll.insert(_data, concern)
+        except OSError:
+            await session.error("write_failed", data_id)
+            return
 
         await session.operation("ok", data_id=data_id)
-        manager.event_manager.emit("doc_insert", {
-            "doc": _data
-        })
+        if manager.event_manager.wants("doc_insert"):
+            manager.event_manager.emit("doc_insert", {
+                "doc": _data
+            })
 
         await manager.log(addr, f"insert", session.db.db_name, coll.name)
             
\ No newline at end of file
@@ -0,0 +1,51 @@
+from .base import Command, split_bulk
+from classes import Manager, Session, Permissions, WriteConcern, Mode
+
+class InsertMany(Command):
+    name = "insert_many"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.WRITE
+    mode = Mode.WRITE
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        docs = data_d.get("docs")
+        if not docs or type(docs) != list:
+            await session.error("format", data_id)
+            return
+
+        concern = data_d.get("write_concern", WriteConcern.NONE)
+        if concern not in WriteConcern.ALL:
+            await session.error("format", data_id)
+            return
+
+        docs, errors = split_bulk(
+            docs,
+            lambda doc: type(doc) == dict and len(doc) > 0 and session.codec.storable(doc),
+            data_d.get("ordered", True)
+        )
+
+        try:
+            await coll.insert_many(docs, concern)
+        except OSError:
+            await session.error("write_failed", data_id)
+            return
+
+        await session.operation("ok", {"result": {
+            "inserted": len(docs),
+            "errors": errors
+        }}, data_id=data_id)
+        if docs and manager.event_manager.wants("doc_insert"):
+            # One event per document, shaped like the ones of insert_doc
+            manager.event_manager.emit_many("doc_insert", [{"doc": doc} for doc in docs])
+
+        await manager.log(addr, f"insert_many {len(docs)}", session.db.db_name, coll.name)
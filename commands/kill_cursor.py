@@ -0,0 +1,22 @@
+from .base import Command
+from classes import Manager, Session, Mode
+
+class KillCursor(Command):
+    name = "kill_cursor"
+    requires_login = True
+    requires_db = False
+    requires_coll = False
+    mode = Mode.READ
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        if not data_d:
+            await session.error("format", data_id)
+            return
+
+        if session.cursors.pop(data_d.get("cursor"), None) == None:
+            await session.error("cursor_not_found", data_id)
+            return
+
+        await session.operation("ok", data_id=data_id)
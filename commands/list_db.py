@@ -1,5 +1,5 @@
 from .base import Command
-from classes import Manager, Session, Permissions
+from classes import Manager, Session, Permissions, Mode
 
 class ListDb(Command):
     name = "list_db"
@@ -7,6 +7,7 @@ class ListDb(Command):
     requires_db = False
     requires_coll = False
     permission = Permissions.READ
+    mode = Mode.READ
 
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         data_id = request.get("id")
@@ -0,0 +1,93 @@
+from .base import Command
+from classes import Manager, Session, Pipeline
+
+class Handler:
+    """
+    A command with its requirements read once, so dispatching a request is
+    a dict lookup followed by a few slot reads.
+    """
+    __slots__ = ("command", "name", "mode", "run", "requires_login", "requires_db", "requires_coll", "permission")
+
+    def __init__(self, command: type[Command]):
+        self.command = command
+        self.name = command.name
+        self.mode = command.mode
+        self.run = command.run
+        self.requires_login = command.requires_login
+        self.requires_db = command.requires_db
+        self.requires_coll = command.requires_coll
+        self.permission = command.permission
+
+    def check(self, session: Session, request: dict) -> str | None:
+        """
+        Returns the error code of the first requirement the request doesnt meet, or None.
+        """
+        if self.requires_login and not session.authed:
+            return "unauthed"
+        if self.requires_db and not session.db:
+            return "non_open"
+        if self.requires_coll:
+            d = request.get("d")
+            if not (session.db and type(d) == dict and d.get("collection")):
+                return "format"
+        if self.permission and not session.user.has_permission(self.permission, session.db.db_name if session.db else None):
+            return "permissions"
+        return None
+
+    async def __call__(self, addr: tuple, request: dict, session: Session, manager: Manager):
+        if error := self.check(session, request):
+            await session.error(error, request.get("id"))
+            return
+
+        try:
+            await self.run(addr, request, session, manager)
+        except Exception as e:
+            # Requests run as pipeline tasks, an escaping error would only end up in "Task exception was never retrieved"
+            d = request.get("d")
+            await manager.log(
+                addr,
+                f"{self.name} failed: {e!r}",
+                session.db.db_name if session.db else None,
+                d.get("collection") if type(d) == dict else None
+            )
+            await session.error("internal", request.get("id"))
+
+class CommandRegistry:
+    """
+    Maps op names to handlers. Built once at startup, further commands
+    can be added with `register`, which also works as a class decorator.
+    """
+
+    def __init__(self, commands: list[type[Command]] = ()):
+        self.handlers: dict[str, Handler] = {}
+        for command in commands:
+            self.register(command)
+
+    def register(self, command: type[Command]) -> type[Command]:
+        if command.name in self.handlers:
+            raise ValueError(f"Command '{command.name}' is already registered")
+
+        self.handlers[command.name] = Handler(command)
+        return command
+
+    async def dispatch(self, addr: tuple, request: dict, session: Session, manager: Manager, pipeline: Pipeline):
+        """
+        Hands a request to its command through the session's pipeline.
+        """
+        handler = self.get(request.get("op"))
+        if handler is None:
+            await session.error("unknown", request.get("id"))
+            return
+
+        d = request.get("d")
+        # Requests on the same collection keep their order
+        key = (session.db.db_name if session.db else None, d.get("collection") if type(d) == dict else None)
+        await pipeline.submit(handler.mode, key, handler(addr, request, session, manager))
+
+    def get(self, name: str) -> Handler | None:
+        if type(name) != str:
+            return None
+        return self.handlers.get(name)
+
+    def names(self) -> list[str]:
+        return list(self.handlers)
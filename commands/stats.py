@@ -0,0 +1,15 @@
+from .base import Command
+from classes import Manager, Session, Permissions, Mode
+
+class Stats(Command):
+    name = "stats"
+    requires_login = True
+    requires_db = False
+    requires_coll = False
+    permission = Permissions.ADMIN
+    mode = Mode.READ
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")
+
+        await session.operation("ok", {"result": manager.stats()}, data_id=data_id)
@@ -1,5 +1,8 @@
 from .base import Command
-from classes import Manager, Session, Permissions
+from classes import Manager, Session, Permissions, WriteConcern, Mode
+from classes.eventmanager import change_diff
+from classes.query import validate
+from classes.update import validate_update
 
 class UpdateDoc(Command):
     name = "update_doc"
@@ -7,6 +10,7 @@ class UpdateDoc(Command):
     requires_db = True
     requires_coll = True
     permission = Permissions.WRITE
+    mode = Mode.WRITE
 
     async def run(addr: tuple, request: dict, session: Session, manager: Manager):
         data_id = request.get("id")    
@@ -22,21 +26,47 @@ class UpdateDoc(Command):
         coll = session.db.get(coll)
 
         query = data_d.get("query")
-        if not query:
+        if not query or not validate(query):
             await session.error("format", data_id)
             return
         
         update = data_d.get("update")
-        if not update:
+        if not validate_update(update) or not session.codec.storable(update):
+            await session.error("format", data_id)
+            return
+        if data_d.get("upsert") and not session.codec.storable(query):
+            # The conditions become fields of the upserted document
             await session.error("format", data_id)
             return
         
-        before, after = await coll.update(query, update)
+        concern = data_d.get("write_concern", WriteConcern.NONE)
+        if concern not in WriteConcern.ALL:
+            await session.error("format", data_id)
+            return
+
+        try:
+            before, after = await coll.update(query, update, concern, bool(data_d.get("upsert")))
+        except OSError:
+            await session.error("write_failed", data_id)
+            return
         
         await session.operation("ok", data_id=data_id)
-        manager.event_manager.emit("doc_update", {
-            "before": before,
-            "after": after
-        })
+        events = manager.event_manager
+        if after and not before:
+            # Nothing matched and the document got upserted
+            if events.wants("doc_insert"):
+                events.emit("doc_insert", {
+                    "doc": after[0]
+                })
+        elif events.wants("doc_update"):
+            # Payloads are only built for the kind of subscribers that exist
+            full = {
+                "before": before[-1] if before else {},
+                "after": after[-1] if after else {}
+            } if events.wants("doc_update", diff=False) else None
+            diff = {
+                "changes": [change_diff(old, new) for old, new in zip(before, after)]
+            } if events.wants("doc_update", diff=True) else None
+            events.emit("doc_update", full, diff)
 
         await manager.log(addr, f"update", session.db.db_name, coll.name)
@@ -0,0 +1,68 @@
+from .base import Command, split_bulk
+from classes import Manager, Session, Permissions, WriteConcern, Mode
+from classes.eventmanager import change_diff
+from classes.query import validate
+from classes.update import validate_update
+
+def _valid(operation, session: Session) -> bool:
+    if type(operation) != dict:
+        return False
+
+    query = operation.get("query")
+    update = operation.get("update")
+    return bool(query) and validate(query) and validate_update(update) and session.codec.storable(update)
+
+class UpdateMany(Command):
+    name = "update_many"
+    requires_login = True
+    requires_db = True
+    requires_coll = True
+    permission = Permissions.WRITE
+    mode = Mode.WRITE
+
+    async def run(addr: tuple, request: dict, session: Session, manager: Manager):
+        data_id = request.get("id")    
+        data_d = request.get("d")
+        coll = data_d.get("collection")
+        if not session.db.collection_exists(coll):
+            await session.error("doesnt_exist", data_id)
+            return
+        coll = session.db.get(coll)
+
+        operations = data_d.get("updates")
+        if not operations or type(operations) != list:
+            await session.error("format", data_id)
+            return
+
+        concern = data_d.get("write_concern", WriteConcern.NONE)
+        if concern not in WriteConcern.ALL:
+            await session.error("format", data_id)
+            return
+
+        operations, errors = split_bulk(operations, lambda operation: _valid(operation, session), data_d.get("ordered", True))
+
+        try:
+            before, after = await coll.update_many(
+                [(operation["query"], operation["update"]) for operation in operations],
+                concern
+            )
+        except OSError:
+            await session.error("write_failed", data_id)
+            return
+
+        await session.operation("ok", {"result": {
+            "updated": len(after),
+            "errors": errors
+        }}, data_id=data_id)
+        events = manager.event_manager
+        if after and events.wants("doc_update"):
+            # One event per document, shaped like the ones of update_doc
+            full = [
+                {"before": old, "after": new} for old, new in zip(before, after)
+            ] if events.wants("doc_update", diff=False) else [None] * len(after)
+            diffs = [
+                {"changes": [change_diff(old, new)]} for old, new in zip(before, after)
+            ] if events.wants("doc_update", diff=True) else None
+            events.emit_many("doc_update", full, diffs)
+
+        await manager.log(addr, f"update_many {len(after)}", session.db.db_name, coll.name)
@@ -1,4 +1,6 @@
 from .connection import Connection
+from .embedded import EmbeddedConnection
+from .pool import ConnectionPool
 from .database import Database
 from .collection import Collection
 from .error import *
\ No newline at end of file
@@ -23,25 +23,63 @@ class Collection:
         
         self._raise_error = self.database._raise_error
         self._send = self.database._send
+
+    def _with_concern(self, data: dict, write_concern: str = None) -> dict:
+        """
+        Internal. Adds the write concern to a request payload if one is set.
+        """
+        if write_concern != None:
+            data["write_concern"] = write_concern
+        return data
     
-    async def insert(self, document: dict):
+    async def insert(self, document: dict, write_concern: str = None):
         """
         Inserts a new document into the collection.
 
         Args:
             document (dict): The document to insert.
+            write_concern (str, optional): "none" (default), "buffered" or "fsync".
+                Controls whether the server replies before, after writing or after syncing to disk.
 
         Raises:
             Error: If the insertion fails.
         """
-        req = await self._send("insert_doc", {
+        req = await self._send("insert_doc", self._with_concern({
             "collection": self.name,
             "dict": document
-        })
+        }, write_concern))
             
         if req.get("op") != "ok":
             self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="insert")
             
+    async def insert_many(self, documents: list[dict], ordered: bool = True, write_concern: str = None) -> dict:
+        """
+        Inserts many documents with a single request. Subscribers get one doc_insert
+        event per inserted document, like for `insert`.
+
+        Args:
+            documents (list[dict]): The documents to insert.
+            ordered (bool, optional): If True (default), stops at the first invalid document.
+                Otherwise invalid documents are skipped and the rest gets inserted.
+            write_concern (str, optional): "none" (default), "buffered" or "fsync".
+
+        Returns:
+            dict: {"inserted": count, "errors": [{"index": i, "error": code}, ...]}
+
+        Raises:
+            Error: If the request itself is invalid.
+        """
+        req = await self._send("insert_many", self._with_concern({
+            "collection": self.name,
+            "docs": documents,
+            "ordered": ordered
+        }, write_concern))
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="insert_many")
+        else:
+            return req["d"]["result"]
+
     async def find_one(self, query: dict):
         """
         Finds a single document matching the query.
@@ -65,12 +103,27 @@ class Collection:
         else:
             return req["d"]["result"]
         
-    async def find_all(self, query: dict = None):
+    async def find_all(
+        self,
+        query: dict = None,
+        sort: dict = None,
+        limit: int = None,
+        skip: int = 0,
+        projection: dict = None
+    ):
         """
         Finds all documents matching the query.
 
         Args:
             query (dict, optional): The filter to apply. If None, returns all documents.
+                Besides plain values, fields can be compared with {"$gt": x}, {"$gte": x},
+                {"$lt": x}, {"$lte": x}, {"$between": [low, high]}, {"$ne": x}, {"$in": [...]},
+                {"$nin": [...]} or {"$exists": bool}. Nested fields are addressed as "a.b".
+            sort (dict, optional): Fields to sort by, mapped to 1 (ascending) or -1 (descending).
+            limit (int, optional): Maximum number of documents to return.
+            skip (int, optional): Number of matching documents to skip first.
+            projection (dict, optional): Fields mapped to 1 to only return those fields,
+                or to 0 to leave them out. "@id" is included unless set to 0.
 
         Returns:
             list[dict]: A list of matching documents.
@@ -78,51 +131,297 @@ class Collection:
         Raises:
             Error: If the query fails.
         """
-        req = await self._send("find_all_doc", {
+        data = {
             "collection": self.name,
             "query": query
-        })
+        }
+        if sort != None:
+            data["sort"] = sort
+        if limit != None:
+            data["limit"] = limit
+        if skip:
+            data["skip"] = skip
+        if projection != None:
+            data["projection"] = projection
+
+        req = await self._send("find_all_doc", data)
             
         if req.get("op") != "ok":
             self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="find_all")
         else:
             return req["d"]["result"]
         
-    async def update(self, query: dict, update: dict):
+    async def find_iter(
+        self,
+        query: dict = None,
+        sort: dict = None,
+        limit: int = None,
+        skip: int = 0,
+        projection: dict = None,
+        batch_size: int = 100
+    ):
+        """
+        Iterates over all documents matching the query, fetching them from the server in batches.
+        Takes the same arguments as `find_all()`.
+
+        Args:
+            batch_size (int, optional): Number of documents per batch.
+
+        Yields:
+            dict: The matching documents.
+
+        Raises:
+            Error: If the query fails.
+
+        Example:
+            async for doc in collection.find_iter({"status": "open"}):
+                ...
+        """
+        data = {
+            "collection": self.name,
+            "query": query,
+            "batch_size": batch_size
+        }
+        if sort != None:
+            data["sort"] = sort
+        if limit != None:
+            data["limit"] = limit
+        if skip:
+            data["skip"] = skip
+        if projection != None:
+            data["projection"] = projection
+
+        req = await self._send("find_all_doc", data)
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="find_iter")
+
+        cursor = req["d"].get("cursor")
+        try:
+            for doc in req["d"]["result"]:
+                yield doc
+
+            while cursor:
+                req = await self._send("get_more", {
+                    "cursor": cursor,
+                    "batch_size": batch_size
+                })
+                if req.get("op") != "ok":
+                    cursor = None
+                    self._raise_error(req["error"], req["id"], action="find_iter")
+
+                cursor = req["d"].get("cursor")
+                for doc in req["d"]["result"]:
+                    yield doc
+        finally:
+            if cursor:
+                # Stopped early, free the cursor on the server
+                await self._send("kill_cursor", {
+                    "cursor": cursor
+                }, response=False)
+
+    async def aggregate(self, pipeline: list[dict]) -> list[dict]:
+        """
+        Runs an aggregation pipeline on the server and returns its result.
+
+        Supported stages: {"$match": query}, {"$group": {"@id": "$field", "total": {"$sum": "$amount"}}}
+        with the accumulators $count, $sum, $avg, $min and $max, {"$sort": {field: 1 | -1}},
+        {"$skip": n}, {"$limit": n}, {"$project": projection} and {"$count": "field"}.
+
+        Args:
+            pipeline (list[dict]): The stages, applied in order.
+
+        Returns:
+            list[dict]: The resulting documents.
+
+        Raises:
+            Error: If the pipeline is invalid.
+        """
+        req = await self._send("aggregate", {
+            "collection": self.name,
+            "pipeline": pipeline
+        })
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="aggregate")
+        else:
+            return req["d"]["result"]
+
+    async def count(self, query: dict = None) -> int:
+        """
+        Counts the documents matching the query without transferring them.
+
+        Args:
+            query (dict, optional): The filter to apply. If None, counts all documents.
+
+        Returns:
+            int: The number of matching documents.
+        """
+        req = await self._send("count_doc", {
+            "collection": self.name,
+            "query": query
+        })
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="count")
+        else:
+            return req["d"]["result"]
+
+    async def update(self, query: dict, update: dict, write_concern: str = None, upsert: bool = False):
         """
         Updates all documents that match the query with the given update instructions.
 
         Args:
             query (dict): Filter to find documents.
-            update (dict): The update to apply.
+            update (dict): The update to apply. Either a plain object whose fields are merged into
+                the documents, or update operators applied on the server:
+                {"$set": {"a.b": 1}}, {"$unset": {"a": 1}}, {"$inc": {"count": 1}},
+                {"$push": {"tags": "x"}} (or {"$each": [...]}) and {"$pull": {"tags": "x"}}.
+            write_concern (str, optional): "none" (default), "buffered" or "fsync".
+            upsert (bool, optional): Inserts a document built from the query and the update if nothing matches.
 
         Raises:
             Error: If the update operation fails.
         """
-        req = await self._send("update_doc", {
+        req = await self._send("update_doc", self._with_concern({
             "collection": self.name,
             "query": query,
-            "update": update
-        })
+            "update": update,
+            "upsert": upsert
+        }, write_concern))
             
         if req.get("op") != "ok":
             self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="update")
             
-    async def delete(self, query: dict):
+    async def update_many(self, updates: list[dict], ordered: bool = True, write_concern: str = None) -> dict:
+        """
+        Applies many updates with a single request, in order. Subscribers get one
+        doc_update event per changed document, like for `update`.
+
+        Args:
+            updates (list[dict]): Operations like {"query": {...}, "update": {...}}.
+            ordered (bool, optional): If True (default), stops at the first invalid operation.
+                Otherwise invalid operations are skipped.
+            write_concern (str, optional): "none" (default), "buffered" or "fsync".
+
+        Returns:
+            dict: {"updated": count, "errors": [{"index": i, "error": code}, ...]}
+
+        Raises:
+            Error: If the request itself is invalid.
+        """
+        req = await self._send("update_many", self._with_concern({
+            "collection": self.name,
+            "updates": updates,
+            "ordered": ordered
+        }, write_concern))
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="update_many")
+        else:
+            return req["d"]["result"]
+
+    async def delete(self, query: dict, write_concern: str = None):
         """
         Deletes all documents matching the given query.
 
         Args:
             query (dict): Filter to determine which documents to delete.
+            write_concern (str, optional): "none" (default), "buffered" or "fsync".
 
         Raises:
             Error: If the deletion fails.
         """
-        req = await self._send("delete_doc", {
+        req = await self._send("delete_doc", self._with_concern({
             "collection": self.name,
             "query": query
-        })
+        }, write_concern))
             
         if req.get("op") != "ok":
             self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="delete")
-    
\ No newline at end of file
+    
+    async def delete_many(self, queries: list[dict], ordered: bool = True, write_concern: str = None) -> dict:
+        """
+        Deletes the documents matching any of the queries with a single request.
+
+        Args:
+            queries (list[dict]): The filters.
+            ordered (bool, optional): If True (default), stops at the first invalid query.
+                Otherwise invalid queries are skipped.
+            write_concern (str, optional): "none" (default), "buffered" or "fsync".
+
+        Returns:
+            dict: {"deleted": count, "errors": [{"index": i, "error": code}, ...]}
+
+        Raises:
+            Error: If the request itself is invalid.
+        """
+        req = await self._send("delete_many", self._with_concern({
+            "collection": self.name,
+            "queries": queries,
+            "ordered": ordered
+        }, write_concern))
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name, action="delete_many")
+        else:
+            return req["d"]["result"]
+
+    async def create_index(self, fields: list[str], type: str = "hash") -> str:
+        """
+        Creates an index. Queries the index can answer use it automatically.
+
+        Args:
+            fields (list[str]): The fields to index.
+            type (str, optional): "hash" for equality lookups on one or more fields, or
+                "sorted" for range queries and sorting on exactly one field.
+
+        Returns:
+            str: The name of the created index.
+
+        Raises:
+            Error: If the index already exists or the request is invalid.
+        """
+        req = await self._send("create_index", {
+            "collection": self.name,
+            "fields": fields,
+            "type": type
+        })
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Index", name="_".join(fields))
+        else:
+            return req["d"]["result"]
+
+    async def drop_index(self, name: str):
+        """
+        Drops an index from the collection.
+
+        Args:
+            name (str): The name of the index.
+
+        Raises:
+            Error: If the index doesnt exist.
+        """
+        req = await self._send("drop_index", {
+            "collection": self.name,
+            "name": name
+        })
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Index", name=name)
+
+    async def list_indexes(self) -> list[dict]:
+        """
+        Lists the indexes of the collection.
+
+        Returns:
+            list[dict]: One entry with name, type and fields per index.
+        """
+        req = await self._send("list_indexes", {
+            "collection": self.name
+        })
+
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], prefix="Collection", name=self.name)
+        else:
+            return req["d"]["result"]
@@ -1,9 +1,9 @@
-import json
 import uuid
-import zstd
 import struct
 import asyncio
 import logging
+from . import codec
+from .compression import Compressor, load_dictionary
 from .error import *
 from .database import Database
 
@@ -18,8 +18,9 @@ class Connection:
     
     def __init__(
         self,
-        host: str,
-        port: int
+        host: str = None,
+        port: int = None,
+        unix_path: str = None
     ):
         """
         Initializes a new Connection instance.
@@ -27,9 +28,12 @@ class Connection:
         Args:
             host (str): The server hostname or IP.
             port (int): The server port number.
+            unix_path (str, optional): Path of the server's unix socket (SERVER_SOCKET).
+                Used instead of host and port, which is faster for clients on the same machine.
         """
         self.host = host
         self.port = port
+        self.unix_path = unix_path
         
         self.database = None
         
@@ -37,6 +41,13 @@ class Connection:
         self._writer = None
         self._authed = False
         self._zstd = False
+        self._zstd_level = 1
+        self._zstd_min_size = 256
+        self._zstd_dict = None
+        self._compressor: Compressor = None
+        self._encoding = codec.JSON.name
+        self._codec = codec.JSON
+        self._event_diffs = False
         self._listen_task = None
 
         self._pending_requests: dict[str, asyncio.Future] = {}
@@ -72,23 +83,34 @@ class Connection:
                 raise ClientError
             case "permissions":
                 raise PermissionError(*args, **kwargs)
+            case "write_failed":
+                raise WriteFailedException
+            case "cursor_not_found":
+                raise CursorNotFoundException
+            case "too_many_cursors":
+                raise TooManyCursorsException
+            case "internal":
+                raise InternalServerException
             case _:
                 raise RuntimeError(f"Unknown error '{error}'")
             
-    async def _write(self, body: str):
+    async def _write(self, body: bytes):
         """
         Internal. Sends a raw message to the server, applying ZSTD compression if enabled.
 
         Args:
-            body (str): UTF-8 string to send.
-        """
-        encoded = body.encode()
-        if self._zstd:
-            encoded = zstd.compress(encoded, 1)
-        header = struct.pack(">I", len(encoded))
+            body (bytes): Encoded body to send.
+        """
+        compressor = self._compressor
+        if compressor is None:
+            header = struct.pack(">I", len(body))
+        elif compressor.wants(len(body)):
+            body = compressor.compress(body)
+            header = struct.pack(">I", compressor.header(len(body), True))
+        else:
+            header = struct.pack(">I", compressor.header(len(body), False))
 
-        body = header + encoded
-        self._writer.write(body)
+        self._writer.writelines((header, body))
         await self._writer.drain()
 
     async def _read(self):
@@ -96,7 +118,7 @@ class Connection:
         Internal. Reads a raw message from the server, handling decompression.
 
         Returns:
-            str | None: The received message as UTF-8 string or None on disconnect.
+            bytes | None: The received message as encoded body or None on disconnect.
         """
         try:
             header = await self._reader.readexactly(HEADER_SIZE)
@@ -104,10 +126,14 @@ class Connection:
             return None
         
         msg_len = struct.unpack(">I", header)[0]
+        compressed = False
+        if self._compressor is not None:
+            msg_len, compressed = self._compressor.parse_header(msg_len)
+
         data = await self._reader.readexactly(msg_len)
-        if self._zstd:
-            data = zstd.uncompress(data)
-        return data.decode()
+        if compressed:
+            data = self._compressor.decompress(data)
+        return data
                     
     async def _send(self, op: str, data: dict = None, response: bool = True) -> dict | None:
         """
@@ -134,7 +160,7 @@ class Connection:
             future = asyncio.get_event_loop().create_future()
             self._pending_requests[request_id] = future
             
-        await self._write(json.dumps(_req))
+        await self._write(self._codec.dumps(_req))
 
         if response:
             return await future
@@ -145,19 +171,44 @@ class Connection:
         password: str,
         zstd: bool = True,
         reconnect: bool = True, 
-        retries: int = 0
+        retries: int = 0,
+        event_diffs: bool = False,
+        encoding: str = "json",
+        zstd_level: int = 1,
+        zstd_min_size: int = 256,
+        zstd_dict: bytes = None
     ):
         """
         Establishes a connection and authenticates with the server. Retries if configured.
+
+        With `event_diffs`, doc_update events carry {"changes": [{"@id", "set", "unset"}, ...]}
+        and doc_delete events {"ids": [...]} instead of full documents.
+
+        `encoding` requests a body encoding ("json" or "msgpack", which needs the msgpack
+        package). Servers that dont support it keep talking JSON.
+
+        Frames smaller than `zstd_min_size` bytes go out uncompressed, unless the server
+        is too old to tell compressed and uncompressed frames apart. `zstd_dict` is a
+        dictionary from `compression.train_dictionary`, it needs the zstandard package and
+        is only used if the server runs with the same one.
         """
+        if encoding not in codec.CODECS:
+            raise ValueError(f"Encoding '{encoding}' is not available")
+
         self._zstd = zstd
+        self._zstd_level = zstd_level
+        self._zstd_min_size = zstd_min_size
+        self._zstd_dict = load_dictionary(zstd_dict) if zstd_dict else None
+        self._encoding = encoding
+        self._event_diffs = event_diffs
         tries = 0
 
         while True:
             try:
                 await self._connect(name, password)
                 break
-            except ConnectionRefusedError:
+            except (ConnectionRefusedError, FileNotFoundError):
+                # A missing socket file just means the server isnt up yet
                 tries += 1
                 
                 if tries >= retries and retries != 0:
@@ -173,7 +224,12 @@ class Connection:
         """
         Internal. Handles low-level connection setup and authentication handshake.
         """
-        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(self.unix_path)
+        elif self.host is None or self.port is None:
+            raise ValueError("Either host and port or unix_path is required")
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
         self._reader = reader
         self._writer = writer
         self._listen_task = asyncio.create_task(self._listen())
@@ -185,16 +241,26 @@ class Connection:
         """
         Internal. Sends credentials and performs the auth negotiation.
         """
-        temp = self._zstd
-        self._zstd = False
+        self._compressor = None
+        self._codec = codec.JSON
         req = await self._send("auth", {
             "name": name,
             "password": password,
-            "zstd": temp
+            "zstd": self._zstd,
+            "zstd_flags": True,
+            "zstd_dict": self._zstd_dict.dict_id() if self._zstd_dict is not None else None,
+            "encoding": self._encoding
         })
 
         if req.get("op") == "authed":
-            self._zstd = temp
+            reply = req.get("d") or {}
+            if self._zstd:
+                # Older servers dont confirm the flags and expect every frame compressed
+                flags = reply.get("zstd_flags") or False
+                dictionary = self._zstd_dict if flags and reply.get("zstd_dict") is not None else None
+                self._compressor = Compressor(self._zstd_level, self._zstd_min_size, dictionary, flags)
+            # Older servers reply without "d" and stay on JSON
+            self._codec = codec.CODECS.get(reply.get("encoding"), codec.JSON)
             self._authed = True
         else:
             self._raise_error(req["error"], req["id"])
@@ -207,7 +273,8 @@ class Connection:
             return
 
         req = await self._send("event_sub", {
-            "events": list(self._event_handlers.keys())
+            "events": list(self._event_handlers.keys()),
+            "diff": self._event_diffs
         })
 
         if req.get("op") != "ok":
@@ -222,19 +289,21 @@ class Connection:
                 req = await self._read()
                 if not req:
                     continue
-                req = json.loads(req.strip())
+                await self._handle(self._codec.loads(req))
+            except codec.DecodeError as e:
+                logger.exception(f"Error while loading JSON: {e}")
 
-                if req.get("op") == "event":
-                    await self._dispatch_event(req["d"]["ev"], req["d"]["d"])
-                else:
-                    req_id = req.get("id")
+    async def _handle(self, req: dict):
+        """
+        Internal. Resolves the pending request a message answers, or dispatches it as an event.
+        """
+        if req.get("op") == "event":
+            await self._dispatch_event(req["d"]["ev"], req["d"]["d"])
+        else:
+            req_id = req.get("id")
 
-                    if req_id in self._pending_requests:
-                        self._pending_requests.pop(req_id).set_result(req)
-            except json.JSONDecodeError as e:
-                logger.exception(f"Error while loading JSON: {e}")
-            except UnicodeDecodeError as e:
-                logger.exception(f"Unicode error")
+            if req_id in self._pending_requests:
+                self._pending_requests.pop(req_id).set_result(req)
 
     async def _dispatch_event(self, event: str, data: dict):
         """
@@ -271,6 +340,12 @@ class Connection:
         """
         self._listen_task.cancel()
         self._writer.close()
+
+    async def wait_closed(self):
+        """
+        Waits until the connection is closed, call after `close`.
+        """
+        await self._writer.wait_closed()
             
     async def open_database(self, name: str):
         """
@@ -332,4 +407,16 @@ class Connection:
             
         if req.get("op") != "ok":
             self._raise_error(req["error"], req["id"], prefix="database", name=name, action="delete_database")
-        
\ No newline at end of file
+
+    async def stats(self) -> dict:
+        """
+        Retrieves server statistics. Requires admin permissions.
+
+        Returns:
+            dict: Statistics grouped by subsystem.
+        """
+        req = await self._send("stats")
+        if req.get("op") != "ok":
+            self._raise_error(req["error"], req["id"], action="stats")
+        else:
+            return req["d"]["result"]
@@ -0,0 +1,86 @@
+import asyncio
+from .connection import Connection
+
+# Logged as the client address of embedded requests
+ADDR = ("embedded", 0)
+
+class EmbeddedConnection(Connection):
+    """
+    Runs the database inside the caller's process and event loop. Requests go straight to
+    the server's commands, without sockets, framing, compression or a listener task, and
+    behave exactly like they do against a server. Documents still pass through the codec
+    in memory, so the caller never shares dicts with the store. The server log goes to the
+    "classes.manager" logger at INFO level instead of stdout.
+
+    Needs the server packages (classes, commands, utils) importable. Only one embedded
+    connection or server may use a data directory at a time.
+    """
+
+    def __init__(self, save_dir: str, max_inflight: int = 16):
+        """
+        Initializes a new EmbeddedConnection instance.
+
+        Args:
+            save_dir (str): The data directory, like SAVE_DIR of the server. When it is used for
+                the first time the root password is taken from the ROOT_PASSWORD env variable.
+            max_inflight (int): How many requests can run at the same time, like MAX_INFLIGHT.
+        """
+        super().__init__()
+        self.save_dir = save_dir
+        self.max_inflight = max_inflight
+
+        self._manager = None
+        self._registry = None
+        self._session = None
+        self._pipeline = None
+        self._closing: asyncio.Task = None
+
+    async def _connect(self, name: str, password: str):
+        """
+        Internal. Starts the database on first use and authenticates a new session.
+        """
+        from utils import setup_data
+        from classes import Manager, LocalSession, Pipeline
+        from commands import CommandRegistry, COMMANDS
+
+        if self._manager is None:
+            if error := setup_data(self.save_dir):
+                raise RuntimeError(error)
+            self._manager = Manager(self.save_dir, log_stdout=False)
+            self._manager.init()
+            self._registry = CommandRegistry(COMMANDS)
+
+        self._session = LocalSession(self._handle)
+        self._pipeline = Pipeline(self.max_inflight)
+        # Nothing travels over a wire
+        self._zstd = False
+
+        await self._auth(name, password)
+        await self._reg_events()
+
+    async def _write(self, body: bytes):
+        """
+        Internal. Hands an encoded request to the commands, replies come back through `_handle`.
+        """
+        request = self._codec.loads(body)
+        await self._registry.dispatch(ADDR, request, self._session, self._manager, self._pipeline)
+
+    def close(self):
+        """
+        Stops the embedded database. Await `wait_closed` afterwards, it returns once
+        running requests finished and pending writes reached the disk.
+        """
+        if self._closing is None:
+            self._closing = asyncio.ensure_future(self._shutdown())
+
+    async def _shutdown(self):
+        await self._pipeline.drain()
+        self._manager.event_manager.remove(self._session)
+        self._session.cursors.clear()
+
+        await self._manager.flush()
+        self._manager.stop()
+
+    async def wait_closed(self):
+        if self._closing is not None:
+            await self._closing
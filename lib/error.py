@@ -29,4 +29,19 @@ class ClientError(Exception):
 class PermissionError(Exception):
     def __init__(self, action: str):
         super().__init__(f"Missing permissions for action \"{action}\"")
-    
\ No newline at end of file
+
+class WriteFailedException(Exception):
+    def __init__(self) -> None:
+        super().__init__("Server failed to write the change to disk")
+
+class CursorNotFoundException(Exception):
+    def __init__(self) -> None:
+        super().__init__("Cursor doesnt exist or is already exhausted")
+
+class TooManyCursorsException(Exception):
+    def __init__(self) -> None:
+        super().__init__("Too many open cursors, finish or stop some iterations first")
+
+class InternalServerException(Exception):
+    def __init__(self) -> None:
+        super().__init__("The server failed to run the request, see its log for details")
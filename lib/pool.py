@@ -0,0 +1,154 @@
+import zlib
+import asyncio
+from .connection import Connection
+
+# Writes to one collection go through the same connection, so they keep their order
+ORDERED_OPS = {
+    "insert_doc", "insert_many", "update_doc", "update_many",
+    "delete_doc", "delete_many", "create_index", "drop_index"
+}
+# Cursors only exist on the connection that opened them
+CURSOR_OPS = {"get_more", "kill_cursor"}
+
+class ConnectionPool:
+    """
+    Several authenticated connections to one server behind the API of a single Connection.
+
+    Requests go to the connection with the fewest requests in flight, so one large reply
+    doesnt hold up everything else. Writes to a collection always use the same connection
+    and keep their order. While writes to a collection are in flight, reads of it take that
+    connection too, so they see the writes like on a single connection. Cursors stay on the
+    connection that opened them. Every connection opens the same database.
+    """
+
+    def __init__(
+        self,
+        host: str = None,
+        port: int = None,
+        size: int = 4,
+        unix_path: str = None
+    ):
+        """
+        Initializes a new ConnectionPool instance.
+
+        Args:
+            host (str): The server hostname or IP.
+            port (int): The server port number.
+            size (int): Number of connections.
+            unix_path (str, optional): Path of the server's unix socket, used instead of host and port.
+        """
+        if size < 1:
+            raise ValueError("A pool needs at least one connection")
+
+        self.size = size
+        self.database = None
+
+        self._connections = [Connection(host, port, unix_path) for _ in range(size)]
+        self._cursors: dict[str, Connection] = {}
+        self._requests = [0] * size
+        # Writes in flight per collection
+        self._writes: dict[str, int] = {}
+
+    async def connect(self, name: str, password: str, **kwargs):
+        """
+        Connects and authenticates every connection, takes the arguments of `Connection.connect`.
+        Event listeners only subscribe on the first connection, so every event arrives once.
+        """
+        await asyncio.gather(*(conn.connect(name, password, **kwargs) for conn in self._connections))
+
+    def event(self, name: str):
+        """
+        Registers a coroutine function as an event listener, see `Connection.event`.
+        """
+        return self._connections[0].event(name)
+
+    def _raise_error(self, error: str, id: str, *args, **kwargs):
+        """
+        Internal. Raises an exception based on an error code received from the server.
+        """
+        self._connections[0]._raise_error(error, id, *args, **kwargs)
+
+    def _key(self, data: dict = None) -> str | None:
+        """
+        Internal. Returns the collection a request works on, or None.
+        """
+        if not data or not data.get("collection"):
+            return None
+        return f"{self.database.name if self.database else ''}/{data['collection']}"
+
+    def _pick(self, op: str, data: dict = None) -> int:
+        """
+        Internal. Returns the index of the connection a request should take.
+        """
+        if op in CURSOR_OPS:
+            conn = self._cursors.get((data or {}).get("cursor"))
+            if conn is not None:
+                return self._connections.index(conn)
+        elif (key := self._key(data)) is not None and (op in ORDERED_OPS or key in self._writes):
+            # On another connection a read could overtake a write that was sent before it
+            return zlib.crc32(key.encode()) % self.size
+
+        return min(range(self.size), key=lambda i: len(self._connections[i]._pending_requests))
+
+    async def _send(self, op: str, data: dict = None, response: bool = True) -> dict | None:
+        """
+        Internal. Sends a command through the least loaded connection and optionally awaits a response.
+        """
+        if op == "open_db":
+            # Part of the session, every connection needs it
+            replies = await asyncio.gather(*(conn._send(op, data, response) for conn in self._connections))
+            return next((reply for reply in replies if reply.get("op") != "ok"), replies[0])
+
+        index = self._pick(op, data)
+        conn = self._connections[index]
+        self._requests[index] += 1
+        key = self._key(data) if op in ORDERED_OPS else None
+        if key is not None:
+            self._writes[key] = self._writes.get(key, 0) + 1
+        try:
+            req = await conn._send(op, data, response)
+        finally:
+            if key is not None:
+                self._writes[key] -= 1
+                if not self._writes[key]:
+                    del self._writes[key]
+
+        if op in CURSOR_OPS:
+            cursor = data.get("cursor")
+            if op == "kill_cursor" or not (req and req.get("op") == "ok" and req["d"].get("cursor")):
+                self._cursors.pop(cursor, None)
+        elif op == "find_all_doc" and req.get("op") == "ok" and req["d"].get("cursor"):
+            self._cursors[req["d"]["cursor"]] = conn
+
+        return req
+
+    # The rest of the API is the one of a single connection, on top of the routing above
+    open_database = Connection.open_database
+    create_database = Connection.create_database
+    list_databases = Connection.list_databases
+    delete_database = Connection.delete_database
+    stats = Connection.stats
+
+    def pool_stats(self) -> dict:
+        """
+        Returns the pool size and, per connection, the requests in flight and sent so far.
+        """
+        return {
+            "size": self.size,
+            "in_flight": [len(conn._pending_requests) for conn in self._connections],
+            "requests": list(self._requests),
+            "open_cursors": len(self._cursors)
+        }
+
+    def close(self):
+        """
+        Closes every connection of the pool.
+        """
+        for conn in self._connections:
+            conn.close()
+
+    async def wait_closed(self):
+        """
+        Waits until every connection is closed, call after `close`.
+        """
+        await asyncio.gather(*(conn.wait_closed() for conn in self._connections))
@@ -1,36 +1,26 @@
 import os
-import json
+import stat
 import dotenv
 import signal
 import asyncio
-from classes import Manager, Session
+from classes import Manager, Session, Pipeline, codec
+from classes.compression import Compression
 from utils import setup_data
 from commands import *
 
 dotenv.load_dotenv(dotenv_path=".env")
 
 manager: Manager = None
-commands: list[Command] = [
-    Auth,
-    CreateCollection,
-    CreateDb,
-    DeleteCollection,
-    DeleteDb,
-    DeleteDoc,
-    EventSub,
-    EventUnsub,
-    FindAllDoc,
-    FindOneDoc,
-    InsertDoc,
-    ListCollections,
-    ListDb,
-    OpenDb,
-    UpdateDoc
-]
+max_inflight: int = 16
+registry = CommandRegistry(COMMANDS)
 
 async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
     addr = writer.get_extra_info("peername")
+    if not addr:
+        # Peers on the unix socket have no address
+        addr = ("unix", writer.get_extra_info("sockname"))
     session = Session(reader, writer)
+    pipeline = Pipeline(max_inflight)
 
     await manager.log(addr, "connected")
     
@@ -39,11 +29,13 @@ async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWrit
             data = await session.read()
             if not data:
                 break
-            data = data.strip()
             try:
-                data = json.loads(data)
-            except json.JSONDecodeError:
-                await session.error(writer, "decoding")
+                data = session.codec.loads(data)
+            except codec.DecodeError:
+                await session.error("decoding")
+                continue
+            if not isinstance(data, dict):
+                await session.error("format")
                 continue
 
             if not session.authed:
@@ -56,20 +48,14 @@ async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWrit
                 await session.error("format", data.get("id"))
                 continue
 
-            for command in commands:
-                if command.name == cmd:
-                    if await command.check_requirements(session, manager, data):
-                        await command.run(addr, data, session, manager)
-                    break
-            else:
-                await session.error("unknown", data.get("id"))
+            await registry.dispatch(addr, data, session, manager, pipeline)
+
+        await pipeline.drain()
     except asyncio.CancelledError:
-        pass
+        pipeline.cancel()
 
-    try:
-       manager.event_manager.subs.pop(session) 
-    except:
-        pass
+    manager.event_manager.remove(session)
+    session.cursors.clear()
     
     await manager.log(addr, "closed")
 
@@ -93,8 +79,39 @@ async def main():
         print(error)
         return
 
+    checkpoint_interval = int(os.environ.get("CHECKPOINT_INTERVAL", 300))
+    checkpoint_size = int(os.environ.get("CHECKPOINT_SIZE", 16 * 1024 * 1024))
+    save_window = float(os.environ.get("SAVE_WINDOW", 0.05))
+    save_workers = int(os.environ.get("SAVE_WORKERS", 4))
+    query_cache_size = int(os.environ.get("QUERY_CACHE_SIZE", 64 * 1024 * 1024))
+
+    global max_inflight
+    max_inflight = int(os.environ.get("MAX_INFLIGHT", 16))
+
+    zstd_dict = None
+    if os.environ.get("ZSTD_DICT"):
+        with open(os.environ["ZSTD_DICT"], "rb") as f:
+            zstd_dict = f.read()
+    try:
+        compression = Compression(
+            level=int(os.environ.get("ZSTD_LEVEL", 1)),
+            min_size=int(os.environ.get("ZSTD_MIN_SIZE", 256)),
+            dictionary=zstd_dict
+        )
+    except RuntimeError as e:
+        print(e)
+        return
+
     global manager
-    manager = Manager(save_dir)
+    manager = Manager(
+        save_dir,
+        checkpoint_interval=checkpoint_interval,
+        checkpoint_size=checkpoint_size,
+        save_window=save_window,
+        save_workers=save_workers,
+        query_cache_size=query_cache_size,
+        compression=compression
+    )
     manager.init()
 
     if not manager.get_user("root"):
@@ -102,16 +119,28 @@ async def main():
         return
 
     server = await asyncio.start_server(handle_client, address, port)
+    servers = [server]
     
     addr = server.sockets[0].getsockname()
     await manager.log(addr, f"Server started on {addr[0]}:{addr[1]}")
 
+    socket_path = os.environ.get("SERVER_SOCKET")
+    if socket_path:
+        # Left behind by a server that didnt shut down cleanly
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.remove(socket_path)
+        servers.append(await asyncio.start_unix_server(handle_client, socket_path))
+        await manager.log(("unix", socket_path), f"Server started on {socket_path}")
+
     try:
-        async with server:
-            await server.serve_forever()
+        await asyncio.gather(*(server.serve_forever() for server in servers))
     except asyncio.CancelledError:
-        server.close()
+        for server in servers:
+            server.close()
+        if socket_path:
+            os.remove(socket_path)
 
+    await manager.flush()
     manager.stop()
         
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+import os
+import math
+import asyncio
+from classes import Manager, WriteConcern
+
+def start(save_dir: str) -> Manager:
+    manager = Manager(str(save_dir))
+    manager.init()
+    return manager
+
+async def restart(manager: Manager) -> Manager:
+    await manager.flush()
+    manager.stop()
+    return start(manager.save_dir)
+
+def test_torn_tail_does_not_swallow_later_records(tmp_path):
+    async def run():
+        os.makedirs(tmp_path / "files")
+        (tmp_path / "files" / "jsondb.json").write_text("{}")
+        manager = start(tmp_path)
+        manager.create_db("db")
+        db = manager.get_db("db")
+        db.create_collection("c")
+        await db.get("c").insert({"n": 1}, WriteConcern.FSYNC)
+
+        # A crash in the middle of an append
+        with open(db.get("c").wal_path, "ab") as f:
+            f.write(b'{"op":"insert","docs":[{"n":2,')
+
+        manager = await restart(manager)
+        coll = manager.get_db("db").get("c")
+        assert [doc["n"] for doc in coll.data.values()] == [1]
+        await coll.insert({"n": 3}, WriteConcern.FSYNC)
+
+        manager = await restart(manager)
+        coll = manager.get_db("db").get("c")
+        assert [doc["n"] for doc in coll.data.values()] == [1, 3]
+        manager.stop()
+
+    asyncio.run(run())
+
+def test_drop_during_checkpoint_leaves_no_files(tmp_path):
+    async def run():
+        os.makedirs(tmp_path / "files")
+        (tmp_path / "files" / "jsondb.json").write_text("{}")
+        manager = start(tmp_path)
+        manager.create_db("db")
+        db = manager.get_db("db")
+        db.create_collection("c")
+        coll = db.get("c")
+        await coll.insert({"n": 1}, WriteConcern.FSYNC)
+
+        # The snapshot is being written in a thread while the collection goes away
+        checkpoint = asyncio.create_task(manager.checkpoint(coll))
+        await asyncio.sleep(0)
+        assert await db.delete_collection("c")
+        await checkpoint
+
+        assert os.listdir(tmp_path / "files" / "db") == []
+        manager = await restart(manager)
+        assert manager.get_db("db").get("c") is None
+        manager.stop()
+
+    asyncio.run(run())
+
+def test_values_orjson_cant_write_survive_a_restart(tmp_path):
+    async def run():
+        os.makedirs(tmp_path / "files")
+        (tmp_path / "files" / "jsondb.json").write_text("{}")
+        manager = start(tmp_path)
+        manager.create_db("db")
+        db = manager.get_db("db")
+        db.create_collection("c")
+        # Separate documents, a big integer alone already sends the whole record through the stdlib
+        await db.get("c").insert({"x": math.nan, "y": math.inf}, WriteConcern.FSYNC)
+        await db.get("c").insert({"big": 2 ** 70}, WriteConcern.FSYNC)
+
+        def check(coll):
+            floats, ints = coll.data.values()
+            assert math.isnan(floats["x"]) and floats["y"] == math.inf and ints["big"] == 2 ** 70
+
+        # Replayed from the log
+        manager = await restart(manager)
+        coll = manager.get_db("db").get("c")
+        check(coll)
+
+        # Read back from the snapshot
+        await manager.checkpoint(coll)
+        manager = await restart(manager)
+        check(manager.get_db("db").get("c"))
+        manager.stop()
+
+    asyncio.run(run())